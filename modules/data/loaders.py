@@ -1,11 +1,74 @@
 """
 Data loading utilities for Council Assistant
 """
+import json
+import os
 import pandas as pd
-import jsonlines
+import pyarrow as pa
 import streamlit as st
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; fall back to the stdlib parser
+    orjson = None
+
+# Columns of the FAISS metadata files read by the search and formatting code.
+# Cold columns (chunk text, hashes) stay on disk in the Arrow sidecar.
+SEARCH_METADATA_COLUMNS = {
+    "agenda_metadata": ["doc_id", "chunk_id", "meeting_id", "committee_id", "meeting_date", "source_type"],
+    "pdf_metadata": ["doc_id", "chunk_id", "display_title", "source_type"]
+}
+
+# pdf_warehouse columns joined onto PDF search results for display
+DOCUMENT_RESULT_COLUMNS = ["url", "display_title", "source_filename", "meeting_date",
+                           "summary", "committee_id", "doc_category", "meeting_id"]
+
+# meetings columns joined onto search results for display
+MEETING_RESULT_COLUMNS = ["web_meeting_code", "committee_name"]
+
+
+def use_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store plain text columns as Arrow-backed strings instead of Python objects
+    
+    Nested columns (lists/dicts) are left as object dtype so downstream
+    code can keep reading them as Python structures.
+    
+    Args:
+        df: DataFrame to convert in place
+        
+    Returns:
+        The same DataFrame with text columns cast to string[pyarrow]
+    """
+    for col in df.columns:
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) == "string":
+            df[col] = df[col].astype("string[pyarrow]")
+    return df
+
+
+def parse_jsonl(raw: bytes) -> List[dict]:
+    """
+    Parse the records of a .jsonl file's contents
+    
+    Uses orjson when it is installed. Files it rejects (pdf_warehouse has
+    bare NaN values, which only the stdlib parser accepts) are parsed
+    again with json.
+    
+    Args:
+        raw: File contents
+        
+    Returns:
+        List of parsed records
+    """
+    lines = [line for line in raw.splitlines() if line.strip()]
+    if orjson is not None:
+        try:
+            return [orjson.loads(line) for line in lines]
+        except orjson.JSONDecodeError:
+            pass
+    return [json.loads(line) for line in lines]
 
 
 def load_jsonl_safe(filepath: Path) -> pd.DataFrame:
@@ -23,19 +86,63 @@ def load_jsonl_safe(filepath: Path) -> pd.DataFrame:
             st.error(f"Missing file: {filepath}")
             return pd.DataFrame()
         
-        with jsonlines.open(filepath) as reader:
-            return pd.DataFrame(list(reader))  # Convert to list first
+        df = pd.DataFrame(parse_jsonl(filepath.read_bytes()))
+        return use_arrow_strings(df)
             
     except Exception as e:
         st.error(f"Failed to load {filepath}: {str(e)}")
         return pd.DataFrame()
 
 
-@st.cache_data
+def _sidecar_temp_path(sidecar: Path) -> Path:
+    """Per-process temp file next to a sidecar, moved onto it once fully written"""
+    return sidecar.with_name(f"{sidecar.stem}.{os.getpid()}{sidecar.suffix}")
+
+
+def load_jsonl_cached(filepath: Path) -> pd.DataFrame:
+    """
+    Load a .jsonl file through a pickled DataFrame sidecar
+    
+    The sidecar (same name, .pkl suffix) is used while it is newer than the
+    .jsonl source, so a fresh process skips JSON parsing. It is rewritten
+    after every re-parse; if it cannot be read or written the .jsonl is
+    simply parsed as usual.
+    
+    Args:
+        filepath: Path to the .jsonl file
+        
+    Returns:
+        DataFrame with loaded data, or empty DataFrame if failed
+    """
+    sidecar = filepath.with_suffix(".pkl")
+    try:
+        if sidecar.exists() and sidecar.stat().st_mtime >= filepath.stat().st_mtime:
+            return pd.read_pickle(sidecar)
+    except Exception:
+        pass  # Stale format or unreadable: re-parse below
+    
+    df = load_jsonl_safe(filepath)
+    if not df.empty:
+        temp_path = _sidecar_temp_path(sidecar)
+        try:
+            # A worker starting cold must never unpickle a half-written file
+            df.to_pickle(temp_path, protocol=5)
+            os.replace(temp_path, sidecar)
+        except Exception:
+            pass  # e.g. read-only data folder
+        finally:
+            temp_path.unlink(missing_ok=True)
+    return df
+
+
+@st.cache_resource
 def load_base_data(paths: Dict[str, Path]) -> Dict[str, pd.DataFrame]:
     """
     Load essential datasets with caching
     
+    Cached as a shared resource (no per-call pickling), so callers must
+    treat the returned DataFrames as read-only.
+    
     Args:
         paths: Dictionary of file paths
         
@@ -43,17 +150,79 @@ def load_base_data(paths: Dict[str, Path]) -> Dict[str, pd.DataFrame]:
         Dictionary of loaded DataFrames
     """
     return {
-        "documents": load_jsonl_safe(paths["pdf_warehouse"]),  # Single source of truth
-        "meetings": load_jsonl_safe(paths["meetings"]),
-        "agendas": load_jsonl_safe(paths["agendas"])
+        "documents": load_jsonl_cached(paths["pdf_warehouse"]),  # Single source of truth
+        "meetings": load_jsonl_cached(paths["meetings"]),
+        "agendas": load_jsonl_cached(paths["agendas"])
     }
 
 
-@st.cache_data
+def _arrow_string_type(arrow_type: pa.DataType):
+    """Map Arrow string columns to pandas string[pyarrow] so buffers are not copied"""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def load_columns_mmap(filepath: Path, columns: List[str]) -> pd.DataFrame:
+    """
+    Load selected columns of a .jsonl file from a memory-mapped Arrow sidecar
+    
+    The sidecar (same name, .arrow suffix) is rebuilt whenever it is missing
+    or older than the .jsonl source. Only the requested columns are
+    materialised; the rest stay on disk. Falls back to a full .jsonl read
+    if the sidecar cannot be written or read.
+    
+    Args:
+        filepath: Path to the .jsonl file
+        columns: Columns to load (missing ones are skipped)
+        
+    Returns:
+        DataFrame with the requested columns, or empty DataFrame if failed
+    """
+    sidecar = filepath.with_suffix(".arrow")
+    try:
+        if not filepath.exists():
+            st.error(f"Missing file: {filepath}")
+            return pd.DataFrame()
+        
+        if not sidecar.exists() or sidecar.stat().st_mtime < filepath.stat().st_mtime:
+            df = load_jsonl_safe(filepath)
+            if df.empty:
+                return df
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            # Other workers only ever see a complete sidecar, never a partial write
+            temp_path = _sidecar_temp_path(sidecar)
+            try:
+                with pa.OSFile(str(temp_path), "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                os.replace(temp_path, sidecar)
+            finally:
+                temp_path.unlink(missing_ok=True)
+        
+        table = pa.ipc.open_file(pa.memory_map(str(sidecar), "r")).read_all()
+        table = table.select([col for col in columns if col in table.column_names])
+        return table.to_pandas(types_mapper=_arrow_string_type)
+    
+    except Exception:
+        # Drop an unreadable sidecar so the next cold start rebuilds it
+        try:
+            sidecar.unlink(missing_ok=True)
+        except OSError:
+            pass
+        df = load_jsonl_safe(filepath)
+        return df[[col for col in columns if col in df.columns]]
+
+
+@st.cache_resource
 def load_search_metadata(paths: Dict[str, Path]) -> Dict[str, pd.DataFrame]:
     """
     Load search index metadata with caching
     
+    Only the columns in SEARCH_METADATA_COLUMNS are loaded, from
+    memory-mapped Arrow sidecars next to the .jsonl files.
+    Returned DataFrames are shared across sessions and must not be mutated.
+    
     Args:
         paths: Dictionary of file paths
         
@@ -61,8 +230,103 @@ def load_search_metadata(paths: Dict[str, Path]) -> Dict[str, pd.DataFrame]:
         Dictionary of loaded metadata DataFrames
     """
     return {
-        "agenda_metadata": load_jsonl_safe(paths["agenda_metadata"]),
-        "pdf_metadata": load_jsonl_safe(paths["pdf_metadata"])
+        name: load_columns_mmap(paths[name], columns)
+        for name, columns in SEARCH_METADATA_COLUMNS.items()
+    }
+
+
+def index_by(df: pd.DataFrame, key: str, columns: list) -> pd.DataFrame:
+    """
+    Index the needed columns of a metadata frame by its id column
+    
+    Frames that are already indexed by ``key`` are reused as-is.
+    
+    Args:
+        df: Metadata DataFrame, either raw or already indexed by key
+        key: Id column to index on
+        columns: Columns that will be read from the indexed frame
+        
+    Returns:
+        DataFrame indexed by the first occurrence of each id
+    """
+    if df.index.name != key:
+        if df.empty or key not in df.columns:
+            return pd.DataFrame()
+        df = df.drop_duplicates(subset=key).set_index(key)
+    return df[[col for col in columns if col in df.columns]]
+
+
+@st.cache_resource
+def load_lookup_tables(paths: Dict[str, Path]) -> Dict[str, pd.DataFrame]:
+    """
+    Build id-indexed lookup frames used to join metadata onto search results
+    
+    Returned DataFrames are shared across sessions and must not be mutated.
+    
+    Args:
+        paths: Dictionary of file paths
+        
+    Returns:
+        Dictionary of indexed lookup DataFrames
+    """
+    data = load_base_data(paths)
+    # The AI prompt also reads meeting dates and titles and document committees
+    return {
+        "meetings_by_id": index_by(data["meetings"], "meeting_id",
+                                   MEETING_RESULT_COLUMNS + ["meeting_date", "meeting_title"]),
+        "agendas_by_id": index_by(data["agendas"], "agenda_id",
+                                  ["item_title", "item_text"]),
+        "documents_by_id": index_by(data["documents"], "doc_id",
+                                    DOCUMENT_RESULT_COLUMNS + ["committee_name"])
+    }
+
+
+def join_lookup(results: pd.DataFrame, lookup: pd.DataFrame, on: str) -> pd.DataFrame:
+    """
+    Left-join an id-indexed lookup frame onto results by a key column
+    
+    Probes the lookup's cached index with the result keys instead of
+    hashing the whole lookup table as ``DataFrame.merge`` does. Columns
+    present on both sides get merge-style ``_x``/``_y`` suffixes.
+    
+    Args:
+        results: Search results with an ``on`` column
+        lookup: Frame indexed by the key, e.g. from load_lookup_tables
+        on: Key column in results
+        
+    Returns:
+        results with the lookup columns appended
+    """
+    if lookup.empty or on not in results.columns:
+        return results
+    return results.join(lookup, on=on, lsuffix="_x", rsuffix="_y")
+
+
+@st.cache_resource
+def load_joined_search_metadata(paths: Dict[str, Path]) -> Dict[str, pd.DataFrame]:
+    """
+    Load search metadata with the meeting and document lookups joined on
+    
+    The joins run once here instead of on every search, so a query only
+    has to take() its hit rows. Returned DataFrames are shared across
+    sessions and must not be mutated.
+    
+    Args:
+        paths: Dictionary of file paths
+        
+    Returns:
+        Dictionary of joined metadata DataFrames, keyed like load_search_metadata
+    """
+    metadata = load_search_metadata(paths)
+    lookups = load_lookup_tables(paths)
+    documents_by_id = index_by(lookups["documents_by_id"], "doc_id", DOCUMENT_RESULT_COLUMNS)
+    meetings_by_id = index_by(lookups["meetings_by_id"], "meeting_id", MEETING_RESULT_COLUMNS)
+    
+    # Documents carry the URLs and meeting ids; meetings the committee names and codes
+    pdf_metadata = join_lookup(metadata["pdf_metadata"], documents_by_id, "doc_id")
+    return {
+        "agenda_metadata": join_lookup(metadata["agenda_metadata"], meetings_by_id, "meeting_id"),
+        "pdf_metadata": join_lookup(pdf_metadata, meetings_by_id, "meeting_id")
     }
 
 
@@ -2,7 +2,20 @@
 AI analysis functionality for generating intelligent summaries of search results
 """
 import pandas as pd
-from openai import OpenAI
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # Annotation only; see semantic_search
+    from openai import OpenAI
+
+from modules.data.loaders import index_by
+
+
+def _lookup(indexed_df: pd.DataFrame, row_id, col: str, default=None):
+    """Read a single cell from an id-indexed frame without building a row Series"""
+    try:
+        return indexed_df.at[row_id, col]
+    except KeyError:
+        return default
 
 
 def build_ai_prompt(query: str, agenda_results: pd.DataFrame, pdf_results: pd.DataFrame, 
@@ -15,77 +28,81 @@ def build_ai_prompt(query: str, agenda_results: pd.DataFrame, pdf_results: pd.Da
         query: Original search query
         agenda_results: DataFrame with agenda search results
         pdf_results: DataFrame with PDF search results
-        agendas_df: Full agendas metadata DataFrame
-        meetings_df: Full meetings metadata DataFrame
-        documents_df: Full documents metadata DataFrame
+        agendas_df: Agendas metadata, ideally indexed by agenda_id (load_lookup_tables)
+        meetings_df: Meetings metadata, ideally indexed by meeting_id
+        documents_df: Documents metadata, ideally indexed by doc_id
         
     Returns:
         Complete prompt string for AI analysis
     """
-    context = ""
+    parts = []
     
     # Add agenda items context
     if not agenda_results.empty:
-        context += "## Relevant Agenda Items:\n"
-        for _, row in agenda_results.head(4).iterrows():
+        # Pre-indexed lookups are used as-is; raw frames are indexed here
+        agendas_by_id = index_by(agendas_df, 'agenda_id', ['item_text'])
+        meetings_by_id = index_by(meetings_df, 'meeting_id',
+                                  ['meeting_date', 'committee_name', 'meeting_title'])
+        
+        parts.append("## Relevant Agenda Items:\n")
+        # Plain dict rows: iterrows() would build a Series per row
+        for row in agenda_results.head(4).to_dict('records'):
             agenda_id = row.get('agenda_id', row.get('chunk_id', ''))
             
             # Get agenda text and meeting info
             agenda_text = ""
             meeting_info = {}
             
-            if agenda_id and not agendas_df.empty:
-                matching_agenda = agendas_df[agendas_df['agenda_id'] == agenda_id]
-                if not matching_agenda.empty:
-                    agenda_text = matching_agenda.iloc[0].get('item_text', '')
+            if pd.notna(agenda_id) and agenda_id in agendas_by_id.index:
+                agenda_text = _lookup(agendas_by_id, agenda_id, 'item_text', '')
+                if pd.isna(agenda_text):
+                    agenda_text = ""
             
             meeting_id = row.get('meeting_id')
-            if meeting_id and not meetings_df.empty:
-                matching_meeting = meetings_df[meetings_df['meeting_id'] == meeting_id]
-                if not matching_meeting.empty:
-                    meeting_row = matching_meeting.iloc[0]
-                    meeting_info = {
-                        'date': meeting_row.get('meeting_date'),
-                        'committee': meeting_row.get('committee_name'),
-                        'title': meeting_row.get('meeting_title')
-                    }
+            if pd.notna(meeting_id) and meeting_id in meetings_by_id.index:
+                meeting_info = {
+                    'date': _lookup(meetings_by_id, meeting_id, 'meeting_date'),
+                    'committee': _lookup(meetings_by_id, meeting_id, 'committee_name'),
+                    'title': _lookup(meetings_by_id, meeting_id, 'meeting_title')
+                }
             
             # Format date
             date_str = "Unknown date"
-            if meeting_info.get('date'):
+            if pd.notna(meeting_info.get('date')):
                 try:
                     date_str = pd.to_datetime(meeting_info['date'], unit='ms').strftime('%d %b %Y')
                 except:
                     pass
             
-            context += f"### {row.get('item_title', 'Agenda Item')}\n"
-            context += f"- Date: {date_str}\n"
-            context += f"- Committee: {meeting_info.get('committee', 'Unknown committee')}\n"
-            context += f"- Meeting: {meeting_info.get('title', '')}\n"
-            context += f"\n**Content:**\n{agenda_text or 'No content available'}\n\n"
+            parts.append(f"### {row.get('item_title', 'Agenda Item')}\n")
+            parts.append(f"- Date: {date_str}\n")
+            parts.append(f"- Committee: {meeting_info.get('committee', 'Unknown committee')}\n")
+            parts.append(f"- Meeting: {meeting_info.get('title', '')}\n")
+            parts.append(f"\n**Content:**\n{agenda_text or 'No content available'}\n\n")
     
     # Add PDF documents context
     if not pdf_results.empty:
-        context += "## Relevant Documents:\n"
-        for _, row in pdf_results.head(6).iterrows():
+        documents_by_id = index_by(documents_df, 'doc_id',
+                                   ['display_title', 'doc_category', 'meeting_date',
+                                    'committee_name', 'summary'])
+        
+        parts.append("## Relevant Documents:\n")
+        for row in pdf_results.head(6).to_dict('records'):
             doc_id = row.get('doc_id')
             doc_meta = {}
             
-            if doc_id and not documents_df.empty:
-                matching_doc = documents_df[documents_df['doc_id'] == doc_id]
-                if not matching_doc.empty:
-                    doc_row = matching_doc.iloc[0]
-                    doc_meta = {
-                        'title': doc_row.get('display_title'),
-                        'type': doc_row.get('doc_category'),
-                        'date': doc_row.get('meeting_date'),
-                        'committee': doc_row.get('committee_name'),
-                        'summary': doc_row.get('summary')
-                    }
+            if pd.notna(doc_id) and doc_id in documents_by_id.index:
+                doc_meta = {
+                    'title': _lookup(documents_by_id, doc_id, 'display_title'),
+                    'type': _lookup(documents_by_id, doc_id, 'doc_category'),
+                    'date': _lookup(documents_by_id, doc_id, 'meeting_date'),
+                    'committee': _lookup(documents_by_id, doc_id, 'committee_name'),
+                    'summary': _lookup(documents_by_id, doc_id, 'summary')
+                }
             
             # Format date
             date_str = "Unknown date"
-            if doc_meta.get('date'):
+            if pd.notna(doc_meta.get('date')):
                 try:
                     date_str = pd.to_datetime(doc_meta['date'], unit='ms').strftime('%d %b %Y')
                 except:
@@ -99,11 +116,13 @@ def build_ai_prompt(query: str, agenda_results: pd.DataFrame, pdf_results: pd.Da
             }
             doc_type = type_mapping.get(doc_type, doc_type)
             
-            context += f"### {doc_meta.get('title', 'Document')}\n"
-            context += f"- Type: {doc_type}\n"
-            context += f"- Date: {date_str}\n"
-            context += f"- Committee: {doc_meta.get('committee', 'Unknown committee')}\n"
-            context += f"\n**Summary:**\n{doc_meta.get('summary', 'No summary available')}\n\n"
+            parts.append(f"### {doc_meta.get('title', 'Document')}\n")
+            parts.append(f"- Type: {doc_type}\n")
+            parts.append(f"- Date: {date_str}\n")
+            parts.append(f"- Committee: {doc_meta.get('committee', 'Unknown committee')}\n")
+            parts.append(f"\n**Summary:**\n{doc_meta.get('summary', 'No summary available')}\n\n")
+    
+    context = ''.join(parts)
     
     return f"""Analyze these council records about '{query}'. Focus on:
 
@@ -124,7 +143,7 @@ Guidelines:
 
 def generate_ai_analysis(query: str, agenda_results: pd.DataFrame, pdf_results: pd.DataFrame,
                         agendas_df: pd.DataFrame, meetings_df: pd.DataFrame, 
-                        documents_df: pd.DataFrame, client: OpenAI, 
+                        documents_df: pd.DataFrame, client: "OpenAI", 
                         model: str = "gpt-4o-mini") -> str:
     """
     Generate AI analysis of search results
@@ -133,9 +152,9 @@ def generate_ai_analysis(query: str, agenda_results: pd.DataFrame, pdf_results:
         query: Original search query
         agenda_results: DataFrame with agenda search results
         pdf_results: DataFrame with PDF search results
-        agendas_df: Full agendas metadata DataFrame
-        meetings_df: Full meetings metadata DataFrame
-        documents_df: Full documents metadata DataFrame
+        agendas_df: Agendas metadata, ideally indexed by agenda_id (load_lookup_tables)
+        meetings_df: Meetings metadata, ideally indexed by meeting_id
+        documents_df: Documents metadata, ideally indexed by doc_id
         client: OpenAI client instance
         model: GPT model to use
         
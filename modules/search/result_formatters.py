@@ -1,105 +1,189 @@
 """
 Result formatting functions for displaying search results in enhanced UI
 """
+import numpy as np
 import pandas as pd
 import streamlit as st
 from urllib.parse import quote
 
+import html
 import re
+from functools import lru_cache
 
-def clean_agenda_text(text):
-    """
-    Improved text cleaning with selective line break preservation
-    - Double line breaks (\n\n) become single breaks (paragraph separation)
-    - Single line breaks (\n) become spaces (continuous text)
-    - Preserves numbered lists and key sections
-    - Handles addresses and references more carefully
-    """
-    if not isinstance(text, str) or not text.strip():
-        return ""
-    
-    cleaned = text
-    
-    # Step 1: Normalize different types of line breaks
-    cleaned = cleaned.replace('\\r\\n', '\n').replace('\\n', '\n').replace('\\r', '\n')
-    cleaned = cleaned.replace('\r\n', '\n').replace('\r', '\n')
-    
-    # Step 2: Fix common spacing issues BEFORE processing line breaks
-    
+from modules.data.loaders import index_by
+
+# Largest epoch offset in milliseconds that pandas Timestamps can represent
+_MAX_EPOCH_MS = 9.2e12
+
+# Relevance stars by L2 distance: a score <= _STAR_EDGES[i] earns _STAR_TABLE[i]
+_STAR_EDGES = np.array([0.9, 1.1, 1.3, 1.5])
+_STAR_TABLE = np.array(["⭐⭐⭐⭐⭐", "⭐⭐⭐⭐", "⭐⭐⭐", "⭐⭐", "⭐"], dtype=object)
+
+
+# Cleanup rules for clean_agenda_text, compiled once at import.
+# Each list is applied in order; the order matters because later rules
+# rely on the spacing introduced by earlier ones. Plain string patterns
+# are literal fixes applied with str.replace instead of the regex engine.
+# A regex rule may carry a third element: a literal that every match must
+# contain, checked with a cheap substring test before running the regex.
+
+# Step 2: Fix common spacing issues BEFORE processing line breaks
+_SPACING_RULES = [
     # Fix missing spaces after numbers in addresses (52ShalloakRoad -> 52 ShalloakRoad)
-    cleaned = re.sub(r'(\d)([A-Z][a-z]+)', r'\1 \2', cleaned)
-    
+    (re.compile(r'(\d)([A-Z][a-z]+)'), r'\1 \2'),
+
     # Fix compound words that should be separated
     # Common patterns in council documents
-    cleaned = re.sub(r'followingconsultations', 'following consultations', cleaned)
-    cleaned = re.sub(r'reservedwith', 'reserved with', cleaned)
-    cleaned = re.sub(r'exceptionofmeans', 'exception of means', cleaned)
-    cleaned = re.sub(r'anddetailed', 'and detailed', cleaned)
-    cleaned = re.sub(r'incwoodland', 'inc woodland', cleaned)
-    cleaned = re.sub(r'excessaccess', 'excess access', cleaned)
-    
-    # Fix "the" + capitalized place names
-    cleaned = re.sub(r'the([A-Z][a-z]+)', r'the \1', cleaned)
-    
-    # Fix "to" + capitalized place names  
-    cleaned = re.sub(r'to([A-Z][a-z]+)', r'to \1', cleaned)
-    
-    # Fix "at" + capitalized place names
-    cleaned = re.sub(r'at([A-Z][a-z]+)', r'at \1', cleaned)
-    
-    # Fix "into" + capitalized place names
-    cleaned = re.sub(r'into([A-Z][a-z]+)', r'into \1', cleaned)
-    
+    ('followingconsultations', 'following consultations'),
+    ('reservedwith', 'reserved with'),
+    ('exceptionofmeans', 'exception of means'),
+    ('anddetailed', 'and detailed'),
+    ('incwoodland', 'inc woodland'),
+    ('excessaccess', 'excess access'),
+
+    # Fix "the" / "to" / "at" / "into" + capitalized place names
+    (re.compile(r'the([A-Z][a-z]+)'), r'the \1', 'the'),
+    (re.compile(r'to([A-Z][a-z]+)'), r'to \1', 'to'),
+    (re.compile(r'at([A-Z][a-z]+)'), r'at \1', 'at'),
+    (re.compile(r'into([A-Z][a-z]+)'), r'into \1', 'into'),
+
     # Fix compound road names (common in UK addresses)
     # Pattern: [lowercase][Uppercase]Road -> [lowercase] [Uppercase] Road
-    cleaned = re.sub(r'([a-z])([A-Z][a-z]+Road)', r'\1 \2', cleaned)
-    
+    (re.compile(r'([a-z])([A-Z][a-z]+Road)'), r'\1 \2', 'Road'),
+
     # Fix compound road names without "Road" suffix
     # Pattern: [lowercase][Uppercase][lowercase] where it's likely a compound
-    cleaned = re.sub(r'([a-z])([A-Z][a-z]*[A-Z][a-z]+)', r'\1 \2', cleaned)
-    
+    (re.compile(r'([a-z])([A-Z][a-z]*[A-Z][a-z]+)'), r'\1 \2'),
+
     # Specific fixes for common UK place name patterns
-    cleaned = re.sub(r'SturryLink', 'Sturry Link', cleaned)
-    cleaned = re.sub(r'ShalloakRoad', 'Shalloak Road', cleaned)
-    cleaned = re.sub(r'SweechbridgeRoad', 'Sweechbridge Road', cleaned)
-    cleaned = re.sub(r'HillboroughRoad', 'Hillborough Road', cleaned)
-    
+    ('SturryLink', 'Sturry Link'),
+    ('ShalloakRoad', 'Shalloak Road'),
+    ('SweechbridgeRoad', 'Sweechbridge Road'),
+    ('HillboroughRoad', 'Hillborough Road'),
+
     # Fix missing spaces around semicolons followed by letters/numbers
-    cleaned = re.sub(r';([a-zA-Z0-9])', r'; \1', cleaned)
-    
+    (re.compile(r';([a-zA-Z0-9])'), r'; \1', ';'),
+
     # Fix missing spaces after closing parentheses followed by capital letters
-    cleaned = re.sub(r'\)([A-Z])', r') \1', cleaned)
-    
+    (re.compile(r'\)([A-Z])'), r') \1', ')'),
+
     # Fix missing spaces before opening parentheses preceded by letters
-    cleaned = re.sub(r'([a-z])(\([a-zA-Z])', r'\1 \2', cleaned)
-    
+    (re.compile(r'([a-z])(\([a-zA-Z])'), r'\1 \2', '('),
+
     # Fix missing spaces around "of" in addresses (upt212sqm -> up to 212 sqm)
-    cleaned = re.sub(r'upt(\d)', r'up to \1', cleaned)
-    cleaned = re.sub(r'(\d)(sqm|sq m)', r'\1 \2', cleaned)
-    
+    (re.compile(r'upt(\d)'), r'up to \1', 'upt'),
+    (re.compile(r'(\d)(sqm|sq m)'), r'\1 \2', 'sq'),
+
     # Fix missing spaces in "excess access" type phrases
-    cleaned = re.sub(r'excess([a-z])', r'excess \1', cleaned)
-    
-    # Step 3: Mark important structural breaks before we process line breaks
-    # These will be preserved as actual line breaks
-    
+    (re.compile(r'excess([a-z])'), r'excess \1', 'excess'),
+]
+
+# Step 3: Mark important structural breaks before we process line breaks
+# These will be preserved as actual line breaks
+_STRUCTURE_RULES = [
     # Mark lettered/numbered application references as new paragraphs
     # Look for patterns like ";(a)", ";(b)", etc. and make them start new lines
-    cleaned = re.sub(r';(\([a-z]\))', r';\n\n\1', cleaned)
-    
+    (re.compile(r';(\([a-z]\))'), r';\n\n\1', ';('),
+
     # Mark numbered lists (but only if they start a clear new item)
-    cleaned = re.sub(r'\.(\d+\.)\s*([A-Z])', r'.\n\n\1 \2', cleaned)
+    (re.compile(r'\.(\d+\.)\s*([A-Z])'), r'.\n\n\1 \2'),
+]
+
+# Mark important sections (these should definitely be new paragraphs).
+# All keywords are found in one zero-width pass; the lookahead also catches
+# keywords that overlap the previous one (e.g. "AGREEDECIDED").
+_SECTION_KEYWORDS = ['RESOLVED', 'RECOMMENDED', 'NOTED', 'AGREED', 'DECIDED', 'EXEMPT ITEMS']
+_SECTION_BREAK = re.compile(
+    r'(?<=[a-z])(?=(' + '|'.join(re.escape(keyword) for keyword in _SECTION_KEYWORDS) + r'))',
+    re.IGNORECASE
+)
+
+# Steps 7-10: Spacing and whitespace fixes after line break processing
+_POST_BREAK_RULES = [
+    # Ensure proper spacing around application references
+    (re.compile(r'Application\s*([A-Z]{2}/\d+)'), r'Application \1', 'Application'),
+
+    # Fix spacing around "and" in lists
+    (re.compile(r'([a-z])and([A-Z])'), r'\1 and \2', 'and'),
+
+    # Improve spacing around locations and lists
+    (re.compile(r'([a-z]);([A-Z])'), r'\1; \2', ';'),
+    (re.compile(r'([a-z]),([A-Z][a-z])'), r'\1, \2', ','),
+
+    # Clean up excessive whitespace
+    (re.compile(r' +'), ' ', '  '),  # Multiple spaces become single space
+    (re.compile(r' *\n *'), '\n', '\n'),  # Remove spaces around line breaks
+
+    # Clean up multiple consecutive line breaks
+    (re.compile(r'\n{3,}'), '\n\n', '\n\n\n'),  # Max 2 consecutive line breaks
+
+    # Fix any remaining spacing issues around common patterns
+    (re.compile(r'(\d+)([A-Z][a-z]+Road)'), r'\1 \2', 'Road'),  # "52ShalloakRoad" -> "52 Shalloak Road"
+    (re.compile(r'(\w)(\([a-z]\))'), r'\1 \2', '('),  # Ensure space before (a), (b), etc.
+]
+
+PARAGRAPH_MARKER = "|||PARAGRAPH_BREAK|||"
+
+
+def _apply_rules(text: str, rules: list) -> str:
+    """Apply (pattern, replacement[, required_substring]) rules to text in order"""
+    for pattern, replacement, *required in rules:
+        if isinstance(pattern, str):
+            text = text.replace(pattern, replacement)
+        elif not required or required[0] in text:
+            text = pattern.sub(replacement, text)
+    return text
+
+
+def _insert_section_breaks(text: str) -> str:
+    """Add a paragraph break before section keywords that directly follow a letter"""
+    last_end = {}
+
+    def _section_break(match):
+        keyword = match.group(1)
+        key = keyword.upper()
+        # A break consumes the letter before the keyword, so the same keyword
+        # repeated back-to-back only gets a break before the first occurrence
+        if last_end.get(key) == match.start():
+            return ''
+        last_end[key] = match.start() + len(keyword)
+        return '\n\n'
+
+    return _SECTION_BREAK.sub(_section_break, text)
+
+
+def clean_agenda_text(text):
+    """
+    Improved text cleaning with selective line break preservation
+    - Double line breaks (\n\n) become single breaks (paragraph separation)
+    - Single line breaks (\n) become spaces (continuous text)
+    - Preserves numbered lists and key sections
+    - Handles addresses and references more carefully
+    
+    Results are memoized per input string, so re-rendering the same rows
+    on reruns and page changes skips the regex work.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return ""
+    return _clean_agenda_text(text)
+
+
+@lru_cache(maxsize=8192)
+def _clean_agenda_text(text: str) -> str:
+    """Clean a non-empty agenda text string (memoized)"""
+    cleaned = text
     
-    # Mark important sections (these should definitely be new paragraphs)
-    section_keywords = ['RESOLVED', 'RECOMMENDED', 'NOTED', 'AGREED', 'DECIDED', 'EXEMPT ITEMS']
-    for keyword in section_keywords:
-        # Add double break before these keywords
-        pattern = r'([a-z])(' + re.escape(keyword) + r')'
-        cleaned = re.sub(pattern, r'\1\n\n\2', cleaned, flags=re.IGNORECASE)
+    # Step 1: Normalize different types of line breaks
+    cleaned = cleaned.replace('\\r\\n', '\n').replace('\\n', '\n').replace('\\r', '\n')
+    cleaned = cleaned.replace('\r\n', '\n').replace('\r', '\n')
+    
+    # Steps 2-3: Spacing fixes, then mark structural breaks
+    cleaned = _apply_rules(cleaned, _SPACING_RULES)
+    cleaned = _apply_rules(cleaned, _STRUCTURE_RULES)
+    cleaned = _insert_section_breaks(cleaned)
     
     # Step 4: Handle the line break conversion strategy
     # First, mark paragraph breaks (double \n\n) with a special marker
-    PARAGRAPH_MARKER = "|||PARAGRAPH_BREAK|||"
     cleaned = cleaned.replace('\n\n', PARAGRAPH_MARKER)
     
     # Step 5: Convert single line breaks to spaces
@@ -108,31 +192,8 @@ def clean_agenda_text(text):
     # Step 6: Restore paragraph breaks as single line breaks
     cleaned = cleaned.replace(PARAGRAPH_MARKER, '\n')
     
-    # Step 7: Additional spacing improvements after line break processing
-    
-    # Ensure proper spacing around application references
-    cleaned = re.sub(r'Application\s*([A-Z]{2}/\d+)', r'Application \1', cleaned)
-    
-    # Fix spacing around "and" in lists
-    cleaned = re.sub(r'([a-z])and([A-Z])', r'\1 and \2', cleaned)
-    
-    # Improve spacing around locations and lists
-    cleaned = re.sub(r'([a-z]);([A-Z])', r'\1; \2', cleaned)
-    cleaned = re.sub(r'([a-z]),([A-Z][a-z])', r'\1, \2', cleaned)
-    
-    # Step 8: Clean up excessive whitespace
-    cleaned = re.sub(r' +', ' ', cleaned)  # Multiple spaces become single space
-    cleaned = re.sub(r'\n +', '\n', cleaned)  # Remove spaces after line breaks
-    cleaned = re.sub(r' +\n', '\n', cleaned)  # Remove spaces before line breaks
-    
-    # Step 9: Clean up multiple consecutive line breaks
-    cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)  # Max 2 consecutive line breaks
-    
-    # Step 10: Final spacing fixes
-    
-    # Fix any remaining spacing issues around common patterns
-    cleaned = re.sub(r'(\d+)([A-Z][a-z]+Road)', r'\1 \2', cleaned)  # "52ShalloakRoad" -> "52 Shalloak Road"
-    cleaned = re.sub(r'(\w)(\([a-z]\))', r'\1 \2', cleaned)  # Ensure space before (a), (b), etc.
+    # Steps 7-10: Spacing and whitespace fixes after line break processing
+    cleaned = _apply_rules(cleaned, _POST_BREAK_RULES)
     
     # Step 11: Final cleanup
     cleaned = cleaned.strip()
@@ -140,6 +201,134 @@ def clean_agenda_text(text):
     return cleaned
 
 
+@lru_cache(maxsize=8192)
+def _clean_title(title: str) -> str:
+    """Strip line breaks, markdown emphasis and repeated whitespace from a title (memoized)"""
+    return ' '.join(title.replace('\\n', '').replace('\n', '').replace('\\r', '').replace('\r', '').replace('**', '').replace('*', '').split()).strip()
+
+
+def format_meeting_dates(results: pd.DataFrame):
+    """
+    Format epoch-millisecond meeting dates for display in one vectorized pass
+
+    Unparseable or missing dates become "Unknown Date" via a NaT mask
+    rather than per-row exception handling.
+
+    Args:
+        results: DataFrame that may contain a meeting_date column
+
+    Returns:
+        numpy array of display strings aligned with the rows of results
+    """
+    if "meeting_date" not in results.columns:
+        return np.full(len(results), "Unknown Date", dtype=object)
+
+    millis = pd.to_numeric(results["meeting_date"], errors="coerce")
+    millis = millis.where(millis.abs() < _MAX_EPOCH_MS)  # Outside Timestamp range
+    dates = pd.to_datetime(millis, unit="ms", errors="coerce")
+    return dates.dt.strftime("%d %b %Y").where(dates.notna(), "Unknown Date").to_numpy(dtype=object)
+
+
+# HTML templates for result cells; each cell is built with one str.format call
+_MEETING_URL_TEMPLATE = "https://democracy.kent.gov.uk/ieListDocuments.aspx?MId={code}"
+_MEETING_BUTTON_TEMPLATE = '<div style="margin-top: 4px;"><a href="{url}" target="_blank" style="background-color: #6c757d; color: white; padding: 2px 8px; border-radius: 12px; font-size: 11px; text-decoration: none; font-weight: 500;">Meeting</a></div>'
+_DATE_TEMPLATE = '<span style="font-weight: 500; color: #555;">{date}</span>{button}'
+_TITLE_LINK_TEMPLATE = '<a href="{url}" target="_blank" style="color: #2c3e50; text-decoration: none; font-weight: 600; font-size: 16px; border-bottom: 1px solid #2c3e50;" onmouseover="this.style.textDecoration=\'underline\'" onmouseout="this.style.textDecoration=\'none\'">{title}</a>'
+_TITLE_SPAN_TEMPLATE = '<span style="color: #2c3e50; font-weight: 600; font-size: 16px;">{title}</span>'
+_AGENDA_ITEM_TEMPLATE = '<div style="margin-bottom: 8px;"><div style="margin-bottom: 6px;">{title}</div><div style="color: #555; font-size: 14px; line-height: 1.6; padding: 8px 0; border-left: 3px solid #e8f4f8; padding-left: 12px; background-color: #fafbfc; white-space: pre-line;">{body}</div></div>'
+_DOCUMENT_TEMPLATE = '<div style="margin-bottom: 8px;">{title}<div style="color: #555; font-size: 14px; margin-top: 8px; line-height: 1.5; padding: 8px 0; border-left: 3px solid #e8f4f8; padding-left: 12px; background-color: #fafbfc;">{body}</div></div>'
+
+
+def _render(template: str, index: pd.Index, **fields) -> pd.Series:
+    """Fill a str.format template once per row from aligned column values"""
+    names = list(fields)
+    return pd.Series([template.format_map(dict(zip(names, values))) for values in zip(*fields.values())],
+                     index=index, dtype=object)
+
+
+def _column(results: pd.DataFrame, name: str, default) -> pd.Series:
+    """Return a column as Python objects, or a constant Series when it is missing"""
+    if name in results.columns:
+        return results[name].astype(object)
+    return pd.Series(default, index=results.index, dtype=object)
+
+
+def _meeting_urls(results: pd.DataFrame) -> tuple:
+    """Return a has-meeting mask and the democracy.kent.gov.uk meeting URL for each row"""
+    codes = _column(results, "web_meeting_code", None)
+    return codes.notna(), _render(_MEETING_URL_TEMPLATE, results.index, code=codes)
+
+
+def _date_cells(results: pd.DataFrame) -> pd.Series:
+    """Build the Meeting Date cell HTML: formatted date plus a meeting button where known"""
+    has_meeting, meeting_url = _meeting_urls(results)
+    meeting_button = [_MEETING_BUTTON_TEMPLATE.format(url=url) if linked else ""
+                      for url, linked in zip(meeting_url, has_meeting)]
+    return _render(_DATE_TEMPLATE, results.index, date=format_meeting_dates(results), button=meeting_button)
+
+
+def _title_cells(title: pd.Series, url: pd.Series, has_url: pd.Series) -> pd.Series:
+    """Render titles as links where a URL is available, plain text otherwise"""
+    return pd.Series([(_TITLE_LINK_TEMPLATE if linked else _TITLE_SPAN_TEMPLATE).format(url=link, title=text)
+                      for text, link, linked in zip(title, url, has_url)],
+                     index=title.index, dtype=object)
+
+
+def _committee_labels(results: pd.DataFrame) -> pd.Series:
+    """Committee name per row, falling back to a prettified committee_id"""
+    names = _column(results, "committee_name", None)
+    from_ids = _column(results, "committee_id", None).map(_committee_name_from_id, na_action="ignore")
+    has_name = names.notna() & names.astype(str).ne("")
+    return names.where(has_name, from_ids.fillna("Unknown Committee"))
+
+
+@lru_cache(maxsize=1024)
+def _committee_name_from_id(committee_id) -> str:
+    """Prettify a committee_id slug into a display name (memoized)"""
+    return str(committee_id).replace("-", " ").replace("_", " ").title()
+
+
+def _star_ratings(results: pd.DataFrame) -> pd.Series:
+    """Map L2 distances to star ratings (lower distance = more stars)"""
+    if "score" not in results.columns:
+        scores = np.full(len(results), 1.5)
+    else:
+        # Non-numeric or missing scores fall through to the lowest rating
+        scores = pd.to_numeric(results["score"], errors="coerce").fillna(np.inf).to_numpy(dtype=float)
+    return pd.Series(_STAR_TABLE[np.searchsorted(_STAR_EDGES, scores, side="left")],
+                     index=results.index, dtype=object)
+
+
+def _title_from_filename(filename):
+    """Turn a source filename into a readable fallback title"""
+    if not isinstance(filename, str):
+        return filename
+    # Remove file extension and clean up filename
+    title = filename.replace('.pdf', '').replace('.doc', '').replace('.docx', '')
+    # Replace underscores and dashes with spaces
+    title = title.replace('_', ' ').replace('-', ' ')
+    # Capitalize words properly
+    return ' '.join(word.capitalize() for word in title.split())
+
+
+def _clean_doc_title(title):
+    """Strip line breaks and markdown emphasis, title-casing all-lowercase titles"""
+    if not isinstance(title, str):
+        return title
+    title = ' '.join(title.replace('\\n', '').replace('\n', '').replace('**', '').replace('*', '').split()).strip()
+    # Ensure proper capitalization for display
+    if title and not any(c.isupper() for c in title):
+        title = title.title()
+    return title
+
+
+def _clean_summary(summary):
+    """Flatten a document summary onto one line without markdown emphasis"""
+    if not isinstance(summary, str):
+        return summary
+    return ' '.join(summary.replace('\\n', ' ').replace('\n', ' ').replace('\\r', ' ').replace('\r', ' ').replace('**', '').replace('*', '').split()).strip()
+
+
 def format_agenda_results_enhanced(results: pd.DataFrame, meetings_df: pd.DataFrame,
                                    agendas_df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -149,110 +338,44 @@ def format_agenda_results_enhanced(results: pd.DataFrame, meetings_df: pd.DataFr
         return pd.DataFrame()
 
     try:
-        # Merge with meetings
+        # Join meeting and agenda details from id-indexed lookups
+        # (pre-indexed frames from load_lookup_tables are used as-is)
         if not meetings_df.empty and "meeting_id" in results.columns:
-            meeting_cols = ["meeting_id"]
-            if "web_meeting_code" in meetings_df.columns:
-                meeting_cols.append("web_meeting_code")
-            if "committee_name" in meetings_df.columns:
-                meeting_cols.append("committee_name")
-
-            results = results.merge(
-                meetings_df[meeting_cols],
-                on="meeting_id",
-                how="left"
-            )
+            meetings_by_id = index_by(meetings_df, "meeting_id", ["web_meeting_code", "committee_name"])
+            meeting_cols = [col for col in meetings_by_id.columns if col not in results.columns]
+            if meeting_cols:
+                results = results.join(meetings_by_id[meeting_cols], on="meeting_id")
 
-        # Merge with agendas
         if not agendas_df.empty:
             chunk_col = "chunk_id" if "chunk_id" in results.columns else "agenda_id"
             if chunk_col in results.columns:
-                agenda_cols = ["agenda_id"]
-                if "item_title" in agendas_df.columns:
-                    agenda_cols.append("item_title")
-                if "item_text" in agendas_df.columns:
-                    agenda_cols.append("item_text")
-
-                results = results.merge(
-                    agendas_df[agenda_cols],
-                    left_on=chunk_col,
-                    right_on="agenda_id",
-                    how="left"
-                )
-
-        enhanced_results = []
-
-        for _, row in results.iterrows():
-            # Format date
-            date_str = "Unknown Date"
-            if "meeting_date" in row and pd.notna(row["meeting_date"]):
-                try:
-                    date_str = pd.to_datetime(row["meeting_date"], unit="ms").strftime("%d %b %Y")
-                except:
-                    pass
-
-            # Create meeting button (copied from PDF tab)
-            meeting_button = ""
-            if pd.notna(row.get("web_meeting_code")):
-                meeting_url = f"https://democracy.kent.gov.uk/ieListDocuments.aspx?MId={row['web_meeting_code']}"
-                meeting_button = f'<div style="margin-top: 4px;"><a href="{meeting_url}" target="_blank" style="background-color: #6c757d; color: white; padding: 2px 8px; border-radius: 12px; font-size: 11px; text-decoration: none; font-weight: 500;">Meeting</a></div>'
-
-            # Format date with button (copied from PDF tab)
-            date_html = f'<span style="font-weight: 500; color: #555;">{date_str}</span>{meeting_button}'
-
-            committee = row.get("committee_name")
-            if pd.isna(committee) or not committee:
-                if 'committee_id' in row and pd.notna(row.get('committee_id')):
-                    committee = str(row['committee_id']).replace("-", " ").replace("_", " ").title()
-                else:
-                    committee = "Unknown Committee"
-
-            item_title = row.get("item_title", "Untitled Agenda Item")
-            item_text = row.get("item_text", "No content available")
-
-            # IMPROVED TEXT CLEANING - preserves structure
-            if isinstance(item_title, str):
-                item_title = ' '.join(item_title.replace('\\n', '').replace('\n', '').replace('\\r', '').replace('\r', '').replace('**', '').replace('*', '').split()).strip()
-
-            if isinstance(item_text, str):
-                # Use improved cleaning that preserves meaningful breaks
-                item_text = clean_agenda_text(item_text)
-            
-            # Create clickable agenda item title (same URL as meeting button)
-            if pd.notna(row.get("web_meeting_code")):
-                meeting_url = f"https://democracy.kent.gov.uk/ieListDocuments.aspx?MId={row['web_meeting_code']}"
-                title_html = f'<a href="{meeting_url}" target="_blank" style="color: #2c3e50; text-decoration: none; font-weight: 600; font-size: 16px; border-bottom: 1px solid #2c3e50;" onmouseover="this.style.textDecoration=\'underline\'" onmouseout="this.style.textDecoration=\'none\'">{item_title}</a>'
-            else:
-                title_html = f'<span style="color: #2c3e50; font-weight: 600; font-size: 16px;">{item_title}</span>'
-
-            # Format with preserved line breaks using <br> tags and better styling
-            formatted_text = item_text.replace('\n\n', '<br><br>').replace('\n', '<br>')
-            agenda_item_html = f'<div style="margin-bottom: 8px;"><div style="margin-bottom: 6px;">{title_html}</div><div style="color: #555; font-size: 14px; line-height: 1.6; padding: 8px 0; border-left: 3px solid #e8f4f8; padding-left: 12px; background-color: #fafbfc; white-space: pre-line;">{formatted_text}</div></div>'
-
-            # Star relevance system (copied from PDF tab)
-            score = row.get('score', 1.5)
-            if isinstance(score, (int, float)):
-                if score <= 0.9:
-                    stars = "⭐⭐⭐⭐⭐"
-                elif score <= 1.1:
-                    stars = "⭐⭐⭐⭐"
-                elif score <= 1.3:
-                    stars = "⭐⭐⭐"
-                elif score <= 1.5:
-                    stars = "⭐⭐"
-                else:
-                    stars = "⭐"
-            else:
-                stars = "⭐"
-
-            enhanced_results.append({
-                "Meeting Date": date_html,  # Now includes the meeting button
-                "Committee": committee,
-                "Agenda Item": agenda_item_html,
-                "Relevance": stars  # Now uses star system instead of numeric score
-            })
-
-        return pd.DataFrame(enhanced_results)
+                agendas_by_id = index_by(agendas_df, "agenda_id", ["item_title", "item_text"])
+                agenda_cols = [col for col in agendas_by_id.columns if col not in results.columns]
+                if agenda_cols:
+                    results = results.join(agendas_by_id[agenda_cols], on=chunk_col)
+
+        date_html = _date_cells(results)
+        committee = _committee_labels(results)
+
+        # IMPROVED TEXT CLEANING - preserves structure
+        item_title = _column(results, "item_title", "Untitled Agenda Item")
+        item_title = item_title.map(_clean_title, na_action="ignore")
+        item_text = _column(results, "item_text", "No content available").map(clean_agenda_text)
+
+        # Create clickable agenda item title (same URL as meeting button)
+        has_meeting, meeting_url = _meeting_urls(results)
+        title_html = _title_cells(item_title, meeting_url, has_meeting)
+
+        # Format with preserved line breaks using <br> tags and better styling
+        formatted_text = item_text.str.replace('\n\n', '<br><br>', regex=False).str.replace('\n', '<br>', regex=False)
+        agenda_item_html = _render(_AGENDA_ITEM_TEMPLATE, results.index, title=title_html, body=formatted_text)
+
+        return pd.DataFrame({
+            "Meeting Date": date_html,  # Now includes the meeting button
+            "Committee": committee,
+            "Agenda Item": agenda_item_html,
+            "Relevance": _star_ratings(results)  # Now uses star system instead of numeric score
+        }).reset_index(drop=True)
 
     except Exception as e:
         st.error(f"Error formatting agenda results: {str(e)}")
@@ -267,134 +390,63 @@ def format_pdf_results_enhanced(results: pd.DataFrame, documents_df: pd.DataFram
         return pd.DataFrame()
 
     try:
-        enhanced_results = []
-
-        for _, row in results.iterrows():
-            date_str = "Unknown Date"
-            if "meeting_date" in row and pd.notna(row["meeting_date"]):
-                try:
-                    date_str = pd.to_datetime(row["meeting_date"], unit="ms").strftime("%d %b %Y")
-                except:
-                    pass
-
-            meeting_button = ""
-            if pd.notna(row.get("web_meeting_code")):
-                meeting_url = f"https://democracy.kent.gov.uk/ieListDocuments.aspx?MId={row['web_meeting_code']}"
-                meeting_button = f'<div style="margin-top: 4px;"><a href="{meeting_url}" target="_blank" style="background-color: #6c757d; color: white; padding: 2px 8px; border-radius: 12px; font-size: 11px; text-decoration: none; font-weight: 500;">Meeting</a></div>'
-
-            date_html = f'<span style="font-weight: 500; color: #555;">{date_str}</span>{meeting_button}'
-
-            committee = row.get('committee_name')
-            if pd.isna(committee) or not committee:
-                if 'committee_id' in row and pd.notna(row.get('committee_id')):
-                    committee = str(row['committee_id']).replace("-", " ").replace("_", " ").title()
-                else:
-                    committee = 'Unknown Committee'
-
-            # FIXED: Handle display_title column suffixes from merge
-            doc_title = None
-            
-            # Try different display_title column names (due to merge suffixes)
-            for col_name in ['display_title', 'display_title_y', 'display_title_x']:
-                if col_name in row and pd.notna(row.get(col_name)) and str(row.get(col_name)).strip():
-                    doc_title = row.get(col_name)
-                    break
-            
-            # If no display_title found, use filename fallback
-            if not doc_title:
-                doc_title = row.get("source_filename", "Document")
-                if isinstance(doc_title, str):
-                    # Remove file extension and clean up filename
-                    doc_title = doc_title.replace('.pdf', '').replace('.doc', '').replace('.docx', '')
-                    # Replace underscores and dashes with spaces
-                    doc_title = doc_title.replace('_', ' ').replace('-', ' ')
-                    # Capitalize words properly
-                    doc_title = ' '.join(word.capitalize() for word in doc_title.split())
-
-            if isinstance(doc_title, str):
-                # Clean up the display title
-                doc_title = ' '.join(doc_title.replace('\\n', '').replace('\n', '').replace('**', '').replace('*', '').split()).strip()
-                # Ensure proper capitalization for display
-                if doc_title and not any(c.isupper() for c in doc_title):
-                    doc_title = doc_title.title()
-
-            # FIXED URL HANDLING - More robust approach
-            doc_url = row.get("url")
-            title_html = ""
-            
-            if pd.notna(doc_url) and doc_url and str(doc_url).strip():
-                # Clean and prepare the URL
-                clean_url = str(doc_url).strip()
-                
-                # If URL doesn't start with http/https, add https://
-                if not clean_url.startswith(('http://', 'https://')):
-                    clean_url = 'https://' + clean_url
-                
-                # Simple URL encoding for common problematic characters
-                clean_url = clean_url.replace(' ', '%20').replace('(', '%28').replace(')', '%29')
-                
-                # Create clickable link
-                title_html = f'<a href="{clean_url}" target="_blank" style="color: #2c3e50; text-decoration: none; font-weight: 600; font-size: 16px; border-bottom: 1px solid #2c3e50;" onmouseover="this.style.textDecoration=\'underline\'" onmouseout="this.style.textDecoration=\'none\'">{doc_title}</a>'
-                
-                # Debug info (remove this in production)
-                # title_html += f'<br><small style="color: #666; font-size: 10px;">URL: {clean_url}</small>'
-            else:
-                # No URL available - just show title
-                title_html = f'<span style="color: #2c3e50; font-weight: 600; font-size: 16px;">{doc_title}</span>'
-
-            doc_type = "Document"
-            doc_type_color = "#6c757d"
-            if "doc_category" in row and pd.notna(row["doc_category"]):
-                type_mapping = {
-                    "prod": ("Report", "#007bff"),
-                    "eqia": ("Impact Assessment", "#28a745"),
-                    "other": ("Document", "#6c757d"),
-                    "minutes": ("Minutes", "#ffc107")
-                }
-                doc_type, doc_type_color = type_mapping.get(str(row["doc_category"]).lower(), ("Document", "#6c757d"))
-
-            summary = row.get("summary", "No summary available")
-            if isinstance(summary, str):
-                summary = ' '.join(summary.replace('\\n', ' ').replace('\n', ' ').replace('\\r', ' ').replace('\r', ' ').replace('**', '').replace('*', '').split()).strip()
-
-            document_html = f'<div style="margin-bottom: 8px;">{title_html}<div style="color: #555; font-size: 14px; margin-top: 8px; line-height: 1.5; padding: 8px 0; border-left: 3px solid #e8f4f8; padding-left: 12px; background-color: #fafbfc;">{summary}</div></div>'
-
-            score = row.get('score', 1.5)
-            if isinstance(score, (int, float)):
-                if score <= 0.9:
-                    stars = "⭐⭐⭐⭐⭐"
-                elif score <= 1.1:
-                    stars = "⭐⭐⭐⭐"
-                elif score <= 1.3:
-                    stars = "⭐⭐⭐"
-                elif score <= 1.5:
-                    stars = "⭐⭐"
-                else:
-                    stars = "⭐"
-            else:
-                stars = "⭐"
-
-            enhanced_results.append({
-                "Meeting Date": date_html,
-                "Committee": committee,
-                "Document": document_html,
-                "Relevance": stars
-            })
-
-        return pd.DataFrame(enhanced_results)
+        date_html = _date_cells(results)
+        committee = _committee_labels(results)
+
+        # Take the first usable display_title (merges may leave _x/_y suffixes)
+        doc_title = pd.Series(None, index=results.index, dtype=object)
+        for col_name in ['display_title', 'display_title_y', 'display_title_x']:
+            if col_name in results.columns:
+                candidates = results[col_name].astype(object)
+                usable = candidates.notna() & candidates.astype(str).str.strip().ne("")
+                doc_title = doc_title.fillna(candidates.where(usable))
+
+        # If no display_title found, use filename fallback
+        missing = doc_title.isna()
+        if missing.any():
+            filenames = _column(results, "source_filename", "Document")[missing]
+            doc_title[missing] = filenames.map(_title_from_filename)
+        doc_title = doc_title.map(_clean_doc_title)
+
+        # Normalise URLs: add a scheme when missing and encode common problem characters
+        doc_url = _column(results, "url", None)
+        url_text = doc_url.astype(str).str.strip()
+        has_url = doc_url.notna() & url_text.ne("")
+        clean_url = url_text.where(url_text.str.startswith(('http://', 'https://')), 'https://' + url_text)
+        clean_url = clean_url.str.replace(' ', '%20', regex=False).str.replace('(', '%28', regex=False).str.replace(')', '%29', regex=False)
+        title_html = _title_cells(doc_title, clean_url, has_url)
+
+        summary = _column(results, "summary", "No summary available").map(_clean_summary)
+        document_html = _render(_DOCUMENT_TEMPLATE, results.index, title=title_html, body=summary)
+
+        return pd.DataFrame({
+            "Meeting Date": date_html,
+            "Committee": committee,
+            "Document": document_html,
+            "Relevance": _star_ratings(results)
+        }).reset_index(drop=True)
 
     except Exception as e:
         st.error(f"Error formatting PDF results: {str(e)}")
         return pd.DataFrame()
 
-def display_results_with_pagination(df: pd.DataFrame, results_per_page: int = 5,
-                                     key_prefix: str = "") -> None:
-    if df.empty:
-        st.info("No results found for your search query.")
-        return
+def get_page_bounds(total_results: int, results_per_page: int = 5,
+                    key_prefix: str = "") -> tuple:
+    """
+    Resolve the current page from session state and return its row bounds
 
-    total_results = len(df)
-    total_pages = (total_results - 1) // results_per_page + 1
+    Lets callers slice raw results before formatting, so only the visible
+    page is formatted on each rerun.
+
+    Args:
+        total_results: Number of result rows across all pages
+        results_per_page: Rows shown per page
+        key_prefix: Session state key prefix for this result set
+
+    Returns:
+        Tuple of (start_idx, end_idx) for the current page
+    """
+    total_pages = max((total_results - 1) // results_per_page + 1, 1)
 
     if f"{key_prefix}_current_page" not in st.session_state:
         st.session_state[f"{key_prefix}_current_page"] = 1
@@ -406,10 +458,40 @@ def display_results_with_pagination(df: pd.DataFrame, results_per_page: int = 5,
 
     start_idx = (current_page - 1) * results_per_page
     end_idx = min(start_idx + results_per_page, total_results)
+    return start_idx, end_idx
+
+
+def display_results_with_pagination(df: pd.DataFrame, results_per_page: int = 5,
+                                     key_prefix: str = "", formatter_fn=None) -> None:
+    """
+    Display results with pagination controls
+
+    With formatter_fn, df holds raw search results and only the slice for
+    the current page is formatted, so each rerun formats one page of rows.
+
+    Args:
+        df: Formatted results, or raw results when formatter_fn is given
+        results_per_page: Rows shown per page
+        key_prefix: Session state key prefix for this result set
+        formatter_fn: Optional callable turning a raw page slice into display rows
+    """
+    if df.empty:
+        st.info("No results found for your search query.")
+        return
+
+    total_results = len(df)
+    total_pages = (total_results - 1) // results_per_page + 1
+
+    start_idx, end_idx = get_page_bounds(total_results, results_per_page, key_prefix)
+    current_page = st.session_state[f"{key_prefix}_current_page"]
     page_df = df.iloc[start_idx:end_idx]
+    if formatter_fn is not None:
+        page_df = formatter_fn(page_df)
+        if page_df.empty:
+            st.info("No results found for your search query.")
+            return
 
-    _apply_results_css()
-    st.markdown(f'<div class="council-results">{page_df.to_html(escape=False, index=False)}</div>',
+    st.markdown(f'<div class="council-results">{_render_results_table(page_df)}</div>',
                 unsafe_allow_html=True)
 
     if total_pages > 1:
@@ -438,8 +520,19 @@ def display_results_with_pagination(df: pd.DataFrame, results_per_page: int = 5,
                 st.rerun()
 
 
-def _apply_results_css() -> None:
-    st.markdown("""
+def _render_results_table(page_df: pd.DataFrame) -> str:
+    """Render a page of pre-formatted HTML cells as a table without pandas' HTML formatter"""
+    header = ''.join(f'<th>{html.escape(str(col))}</th>' for col in page_df.columns)
+    rows = ''.join(
+        '<tr>' + ''.join(f'<td>{value}</td>' for value in record) + '</tr>'
+        for record in page_df.itertuples(index=False, name=None)
+    )
+    return (f'<table border="1" class="dataframe"><thead><tr style="text-align: right;">{header}</tr></thead>'
+            f'<tbody>{rows}</tbody></table>')
+
+
+# Styling for the .council-results tables, injected by apply_results_css
+_RESULTS_CSS = """
     <style>
     .council-results table {
         border-collapse: collapse;
@@ -502,4 +595,15 @@ def _apply_results_css() -> None:
         background-color: #f1f3f4;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+
+def apply_results_css() -> None:
+    """
+    Inject the results table styling
+
+    Call once per script run, before any results tables are displayed;
+    Streamlit drops elements that a rerun does not emit again, so the
+    style block cannot be skipped on later runs.
+    """
+    st.markdown(_RESULTS_CSS, unsafe_allow_html=True)
@@ -4,40 +4,75 @@ Semantic search functionality using FAISS and OpenAI embeddings
 import numpy as np
 import pandas as pd
 import faiss
-from openai import OpenAI
 import streamlit as st
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:  # openai is slow to import and only the caller builds the client
+    from openai import OpenAI
 
-def get_embedding(query: str, client: OpenAI) -> np.ndarray:
+# Search-time settings for approximate indexes (flat indexes ignore these)
+IVF_NPROBE = 16
+HNSW_EF_SEARCH = 64
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_embeddings(queries: tuple, _client: "OpenAI") -> np.ndarray:
     """
-    Generate embedding vector for search query using OpenAI API
+    Fetch and memoize embeddings for a batch of queries in one API call
+
+    Keyed on the query texts only (the leading underscore keeps the client
+    out of the cache key), so the agenda and PDF searches for the same
+    query share one API call. Failures raise and are not cached.
+    """
+    response = _client.embeddings.create(
+        input=list(queries),
+        model="text-embedding-3-small"
+    )
+    ordered = sorted(response.data, key=lambda item: item.index)
+    return np.array([item.embedding for item in ordered], dtype=np.float32)
+
+
+def get_embeddings(queries: list, client: "OpenAI") -> np.ndarray:
+    """
+    Generate embedding vectors for several queries with a single API request
     
     Args:
-        query: Search query string
+        queries: Search query strings
         client: OpenAI client instance
         
     Returns:
-        numpy array of embedding vector, or None if failed
+        numpy array of shape (len(queries), d), or None if failed
     """
     try:
-        response = client.embeddings.create(
-            input=[query],
-            model="text-embedding-3-small"
-        )
-        return np.array(response.data[0].embedding, dtype=np.float32).reshape(1, -1)
+        return _cached_embeddings(tuple(queries), client)
     except Exception as e:
         st.error(f"Embedding generation failed: {str(e)}")
         return None
 
 
+def get_embedding(query: str, client: "OpenAI") -> np.ndarray:
+    """
+    Generate embedding vector for search query using OpenAI API
+    
+    Args:
+        query: Search query string
+        client: OpenAI client instance
+        
+    Returns:
+        numpy array of embedding vector, or None if failed
+    """
+    return get_embeddings([query], client)
+
+
 @st.cache_resource
-def load_search_index(index_path: str) -> faiss.Index:
+def load_search_index(index_path: str, quantize: bool = True) -> faiss.Index:
     """
     Load FAISS index with error handling and caching
     
     Args:
         index_path: Path to FAISS index file
+        quantize: Re-encode flat indexes as 8-bit scalar-quantized in memory
         
     Returns:
         FAISS index object or None if failed
@@ -46,13 +81,92 @@ def load_search_index(index_path: str) -> faiss.Index:
         if not Path(index_path).exists():
             st.error(f"Missing index file: {index_path}")
             return None
-        return faiss.read_index(str(index_path))
+        index = faiss.read_index(str(index_path))
+        if quantize:
+            index = _quantize_flat_index(index)
+        return _configure_index(index)
     except Exception as e:
         st.error(f"Failed to load search index: {str(e)}")
         return None
 
 
-def search_agendas(query: str, client: OpenAI, index: faiss.Index, 
+def _quantize_flat_index(index: faiss.Index) -> faiss.Index:
+    """
+    Re-encode a flat index with 8-bit scalar quantization
+
+    Stores 1 byte per dimension instead of 4, so each search streams a
+    quarter of the memory; query vectors stay float32. Non-flat indexes
+    are returned unchanged.
+    """
+    if not isinstance(index, faiss.IndexFlat) or index.ntotal == 0:
+        return index
+    vectors = index.reconstruct_n(0, index.ntotal)
+    quantized = faiss.IndexScalarQuantizer(index.d, faiss.ScalarQuantizer.QT_8bit, index.metric_type)
+    quantized.train(vectors)
+    quantized.add(vectors)
+    return quantized
+
+
+def _configure_index(index: faiss.Index) -> faiss.Index:
+    """Apply search-time recall settings when an index is IVF or HNSW based"""
+    try:
+        faiss.extract_index_ivf(index).nprobe = IVF_NPROBE
+    except RuntimeError:
+        pass  # Not an IVF index
+    hnsw_index = faiss.downcast_index(index)
+    if hasattr(hnsw_index, "hnsw"):
+        hnsw_index.hnsw.efSearch = HNSW_EF_SEARCH
+    return index
+
+
+def _search_index(embedding: np.ndarray, index: faiss.Index,
+                  metadata_df: pd.DataFrame, k: int) -> pd.DataFrame:
+    """Run one FAISS search for a (1, d) query embedding and attach metadata rows"""
+    distances, indices = index.search(embedding, k)
+    
+    # Keep hits that map to metadata rows (FAISS pads missing hits with -1).
+    # A mask keeps FAISS's ascending-distance order, so no re-sort is needed.
+    valid = (indices[0] >= 0) & (indices[0] < len(metadata_df))
+    if not valid.any():
+        return pd.DataFrame()
+        
+    # take() already returns a new frame, so the shared metadata is never written to
+    results = metadata_df.take(indices[0][valid])
+    results["score"] = distances[0][valid]
+    return results
+
+
+def search_all(query: str, client: "OpenAI", indices: dict, metadata_dfs: dict,
+               k: int = 10) -> dict:
+    """
+    Search several FAISS indices with a single query embedding
+    
+    Args:
+        query: Search query string
+        client: OpenAI client instance
+        indices: FAISS indices keyed by name (e.g. "agenda", "pdf")
+        metadata_dfs: Metadata DataFrames keyed by the same names
+        k: Number of results to return per index
+        
+    Returns:
+        Dict of result DataFrames keyed by index name (empty on failure)
+    """
+    searchable = [name for name, index in indices.items()
+                  if index is not None and not metadata_dfs.get(name, pd.DataFrame()).empty]
+    results = {name: pd.DataFrame() for name in indices}
+    if not searchable:
+        return results
+
+    embedding = get_embedding(query, client)
+    if embedding is None:
+        return results
+
+    for name in searchable:
+        results[name] = _search_index(embedding, indices[name], metadata_dfs[name], k)
+    return results
+
+
+def search_agendas(query: str, client: "OpenAI", index: faiss.Index, 
                   metadata_df: pd.DataFrame, k: int = 10) -> pd.DataFrame:
     """
     Search agenda items using FAISS semantic search
@@ -67,27 +181,10 @@ def search_agendas(query: str, client: OpenAI, index: faiss.Index,
     Returns:
         DataFrame with search results and scores
     """
-    if index is None or metadata_df.empty:
-        return pd.DataFrame()
-        
-    embedding = get_embedding(query, client)
-    if embedding is None:
-        return pd.DataFrame()
-    
-    # FAISS search
-    distances, indices = index.search(embedding, k)
-    
-    # Prepare results
-    valid_indices = indices[0][indices[0] < len(metadata_df)]  # Filter valid indices
-    if len(valid_indices) == 0:
-        return pd.DataFrame()
-        
-    results = metadata_df.iloc[valid_indices].copy()
-    results["score"] = distances[0][:len(valid_indices)]
-    return results.sort_values("score")
+    return search_all(query, client, {"agenda": index}, {"agenda": metadata_df}, k)["agenda"]
 
 
-def search_pdfs(query: str, client: OpenAI, index: faiss.Index, 
+def search_pdfs(query: str, client: "OpenAI", index: faiss.Index, 
                metadata_df: pd.DataFrame, k: int = 10) -> pd.DataFrame:
     """
     Search PDF documents using FAISS semantic search
@@ -102,24 +199,20 @@ def search_pdfs(query: str, client: OpenAI, index: faiss.Index,
     Returns:
         DataFrame with search results and scores
     """
-    if index is None or metadata_df.empty:
-        return pd.DataFrame()
-        
-    embedding = get_embedding(query, client)
-    if embedding is None:
-        return pd.DataFrame()
-    
-    # FAISS search
-    distances, indices = index.search(embedding, k)
+    return search_all(query, client, {"pdf": index}, {"pdf": metadata_df}, k)["pdf"]
+
+
+def _meeting_date_sort_key(meeting_dates: pd.Series) -> pd.Series:
+    """
+    Sort key for epoch-millisecond meeting dates
     
-    # Prepare results
-    valid_indices = indices[0][indices[0] < len(metadata_df)]  # Filter valid indices
-    if len(valid_indices) == 0:
-        return pd.DataFrame()
-        
-    results = metadata_df.iloc[valid_indices].copy()
-    results["score"] = distances[0][:len(valid_indices)]
-    return results.sort_values("score")
+    Numeric and datetime columns sort as-is; object columns (mixed types
+    after a join) are coerced to numbers once so the sort compares floats
+    instead of Python objects, with unparseable dates last.
+    """
+    if pd.api.types.is_numeric_dtype(meeting_dates) or pd.api.types.is_datetime64_any_dtype(meeting_dates):
+        return meeting_dates
+    return pd.to_numeric(meeting_dates, errors="coerce")
 
 
 def sort_results(results_df: pd.DataFrame, sort_method: str) -> pd.DataFrame:
@@ -138,12 +231,12 @@ def sort_results(results_df: pd.DataFrame, sort_method: str) -> pd.DataFrame:
 
     if sort_method == "Date (earliest first)":
         if "meeting_date" in results_df.columns:
-            return results_df.sort_values("meeting_date", ascending=True)
+            return results_df.sort_values("meeting_date", ascending=True, key=_meeting_date_sort_key)
         elif "Date" in results_df.columns:
             return results_df.sort_values("Date", ascending=True)
     elif sort_method == "Date (latest first)":
         if "meeting_date" in results_df.columns:
-            return results_df.sort_values("meeting_date", ascending=False)
+            return results_df.sort_values("meeting_date", ascending=False, key=_meeting_date_sort_key)
         elif "Date" in results_df.columns:
             return results_df.sort_values("Date", ascending=False)
 
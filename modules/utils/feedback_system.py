@@ -2,6 +2,7 @@
 User feedback system for Council Assistant
 Provides UI components for collecting user feedback and bug reports
 """
+import time
 import streamlit as st
 from typing import Optional
 from .logging_system import log_feedback, log_interaction
@@ -21,171 +22,228 @@ def show_feedback_sidebar():
 def show_feedback_modal():
     """Show feedback modal dialog"""
     if st.session_state.get("show_feedback", False):
-        with st.container():
+        # The form sends its widgets in a single rerun on submit, and the
+        # placeholder lets the modal close without calling st.rerun()
+        modal = st.empty()
+        with modal.container():
             st.markdown("### 💬 Your Feedback")
             st.markdown("Help us improve Kent County Council Records Search!")
             
             # Feedback form
-            feedback_type = st.selectbox(
-                "What type of feedback?",
-                ["General Feedback", "Feature Request", "Search Quality", "Interface Improvement"],
-                key="feedback_type"
-            )
-            
-            rating = st.slider(
-                "How would you rate your experience? (1=Poor, 5=Excellent)",
-                min_value=1, max_value=5, value=3,
-                key="feedback_rating"
-            )
-            
-            message = st.text_area(
-                "Please share your thoughts:",
-                placeholder="What's working well? What could be improved?",
-                height=100,
-                key="feedback_message"
-            )
-            
-            contact_info = st.text_input(
-                "Email (optional - for follow-up):",
-                placeholder="your.email@example.com",
-                key="feedback_contact"
-            )
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("Submit Feedback", type="primary", key="submit_feedback_btn"):
-                    if message.strip():
-                        # Log the feedback
-                        log_feedback(
-                            feedback_type=feedback_type,
-                            message=message,
-                            rating=rating,
-                            contact_info=contact_info if contact_info.strip() else None,
-                            query_context=st.session_state.get("query", "")
-                        )
-                        
-                        st.success("Thank you for your feedback! 🙏")
-                        st.session_state.show_feedback = False
-                        st.rerun()
-                    else:
-                        st.error("Please enter your feedback message.")
-            
-            with col2:
-                if st.button("Cancel", key="cancel_feedback_btn"):
-                    st.session_state.show_feedback = False
-                    st.rerun()
+            with st.form("feedback_form"):
+                feedback_type = st.selectbox(
+                    "What type of feedback?",
+                    ["General Feedback", "Feature Request", "Search Quality", "Interface Improvement"],
+                    key="feedback_type"
+                )
+                
+                rating = st.slider(
+                    "How would you rate your experience? (1=Poor, 5=Excellent)",
+                    min_value=1, max_value=5, value=3,
+                    key="feedback_rating"
+                )
+                
+                message = st.text_area(
+                    "Please share your thoughts:",
+                    placeholder="What's working well? What could be improved?",
+                    height=100,
+                    key="feedback_message"
+                )
+                
+                contact_info = st.text_input(
+                    "Email (optional - for follow-up):",
+                    placeholder="your.email@example.com",
+                    key="feedback_contact"
+                )
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    submitted = st.form_submit_button("Submit Feedback", type="primary")
+                with col2:
+                    cancelled = st.form_submit_button("Cancel")
+        
+        if submitted:
+            if message.strip():
+                # Log the feedback
+                log_feedback(
+                    feedback_type=feedback_type,
+                    message=message,
+                    rating=rating,
+                    contact_info=contact_info if contact_info.strip() else None,
+                    query_context=st.session_state.get("query", "")
+                )
+                
+                st.session_state.show_feedback = False
+                modal.empty()
+                st.success("Thank you for your feedback! 🙏")
+            else:
+                st.error("Please enter your feedback message.")
+        elif cancelled:
+            st.session_state.show_feedback = False
+            modal.empty()
 
 def show_bug_report_modal():
     """Show bug report modal dialog"""
     if st.session_state.get("show_bug_report", False):
-        with st.container():
+        modal = st.empty()
+        with modal.container():
             st.markdown("### 🐛 Report a Bug")
             st.markdown("Help us fix issues by describing what went wrong.")
             
-            # Bug report form
-            bug_type = st.selectbox(
-                "What type of issue?",
-                ["Search not working", "Results incorrect", "Page loading error", "Interface problem", "Other"],
-                key="bug_type"
-            )
-            
             current_query = st.session_state.get("query", "")
-            if current_query:
-                st.info(f"Current search: '{current_query}'")
-            
-            description = st.text_area(
-                "Describe the problem:",
-                placeholder="What were you trying to do? What happened instead? Include any error messages you saw.",
-                height=120,
-                key="bug_description"
-            )
             
-            steps = st.text_area(
-                "Steps to reproduce (optional):",
-                placeholder="1. I searched for...\n2. I clicked on...\n3. Then I saw...",
-                height=80,
-                key="bug_steps"
-            )
-            
-            contact_info = st.text_input(
-                "Email (optional - for follow-up):",
-                placeholder="your.email@example.com",
-                key="bug_contact"
-            )
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("Submit Bug Report", type="primary", key="submit_bug_btn"):
-                    if description.strip():
-                        # Combine description and steps
-                        full_message = description
-                        if steps.strip():
-                            full_message += f"\n\nSteps to reproduce:\n{steps}"
-                        
-                        # Log the bug report
-                        log_feedback(
-                            feedback_type=f"Bug Report - {bug_type}",
-                            message=full_message,
-                            contact_info=contact_info if contact_info.strip() else None,
-                            query_context=current_query
-                        )
-                        
-                        st.success("Bug report submitted! We'll investigate this issue. 🔍")
-                        st.session_state.show_bug_report = False
-                        st.rerun()
-                    else:
-                        st.error("Please describe the problem you encountered.")
-            
-            with col2:
-                if st.button("Cancel", key="cancel_bug_btn"):
-                    st.session_state.show_bug_report = False
-                    st.rerun()
+            # Bug report form
+            with st.form("bug_report_form"):
+                bug_type = st.selectbox(
+                    "What type of issue?",
+                    ["Search not working", "Results incorrect", "Page loading error", "Interface problem", "Other"],
+                    key="bug_type"
+                )
+                
+                if current_query:
+                    st.info(f"Current search: '{current_query}'")
+                
+                description = st.text_area(
+                    "Describe the problem:",
+                    placeholder="What were you trying to do? What happened instead? Include any error messages you saw.",
+                    height=120,
+                    key="bug_description"
+                )
+                
+                steps = st.text_area(
+                    "Steps to reproduce (optional):",
+                    placeholder="1. I searched for...\n2. I clicked on...\n3. Then I saw...",
+                    height=80,
+                    key="bug_steps"
+                )
+                
+                contact_info = st.text_input(
+                    "Email (optional - for follow-up):",
+                    placeholder="your.email@example.com",
+                    key="bug_contact"
+                )
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    submitted = st.form_submit_button("Submit Bug Report", type="primary")
+                with col2:
+                    cancelled = st.form_submit_button("Cancel")
+        
+        if submitted:
+            if description.strip():
+                # Combine description and steps
+                full_message = description
+                if steps.strip():
+                    full_message += f"\n\nSteps to reproduce:\n{steps}"
+                
+                # Log the bug report
+                log_feedback(
+                    feedback_type=f"Bug Report - {bug_type}",
+                    message=full_message,
+                    contact_info=contact_info if contact_info.strip() else None,
+                    query_context=current_query
+                )
+                
+                st.session_state.show_bug_report = False
+                modal.empty()
+                st.success("Bug report submitted! We'll investigate this issue. 🔍")
+            else:
+                st.error("Please describe the problem you encountered.")
+        elif cancelled:
+            st.session_state.show_bug_report = False
+            modal.empty()
 
 def show_quick_feedback():
-    """Show quick feedback thumbs up/down buttons"""
-    if st.session_state.get("query") and (
-        st.session_state.get("agenda_results") is not None or 
-        st.session_state.get("pdf_results") is not None
+    """Show quick feedback thumbs up/down buttons (one vote per query)"""
+    state = st.session_state
+    query = state.get("query", "")
+    if query and (
+        state.get("agenda_results") is not None or 
+        state.get("pdf_results") is not None
     ):
         st.markdown("---")
         st.markdown("**Was this search helpful?**")
         
+        # Once this query has been rated the buttons stay disabled
+        already_rated = state.get("_quick_fb_key") == query
+        
         col1, col2, col3 = st.columns([1, 1, 8])  # Changed from [1, 1, 3] to [1, 1, 8]
         
         with col1:
-            if st.button("👍", help="Yes, helpful", key="thumbs_up_btn"):
+            if st.button("👍", help="Yes, helpful", key="thumbs_up_btn", disabled=already_rated):
+                state["_quick_fb_key"] = query
                 log_feedback(
                     feedback_type="Quick Feedback",
                     message="Thumbs up - search was helpful",
                     rating=4,
-                    query_context=st.session_state.get("query", "")
+                    query_context=query
                 )
                 st.success("Thanks! 👍")
         
         with col2:
-            if st.button("👎", help="Not helpful", key="thumbs_down_btn"):
+            if st.button("👎", help="Not helpful", key="thumbs_down_btn", disabled=already_rated):
+                state["_quick_fb_key"] = query
                 log_feedback(
                     feedback_type="Quick Feedback", 
                     message="Thumbs down - search was not helpful",
                     rating=2,
-                    query_context=st.session_state.get("query", "")
+                    query_context=query
                 )
                 st.info("Thanks for letting us know. Consider using the feedback button for more details.")
 
+# Identical tab, filter or pagination events within this many seconds are
+# logged as one entry whose details carry a "count"
+INTERACTION_COALESCE_WINDOW = 2.0
+
+def _log_coalesced(interaction_type: str, key, value, details: dict):
+    """
+    Log an interaction, merging rapid identical repeats into one entry
+    
+    The first event of a burst is held in session state. Repeats of the same
+    value under the same key within INTERACTION_COALESCE_WINDOW seconds only
+    bump its count. A held burst is logged, with "count" added to its
+    details, once a different value arrives for its key or its window has
+    passed by the next coalesced interaction in the session.
+    
+    Args:
+        interaction_type: Interaction type passed on to the logger
+        key: What repeats are matched on, e.g. the filter type
+        value: Value compared between events under the same key
+        details: Details of the latest event
+    """
+    bursts = st.session_state.setdefault("_interaction_bursts", {})
+    now = time.time()
+    burst = bursts.get(key)
+    if burst is not None and burst["value"] == value and now - burst["start"] < INTERACTION_COALESCE_WINDOW:
+        burst["count"] += 1
+        burst["details"] = details
+        return
+    
+    bursts[key] = {"interaction_type": interaction_type, "value": value,
+                   "details": details, "start": now, "count": 1}
+    # Log the burst this event replaced and any whose window has closed
+    ended = [burst] if burst is not None else []
+    for other_key, other in list(bursts.items()):
+        if other_key != key and now - other["start"] >= INTERACTION_COALESCE_WINDOW:
+            ended.append(bursts.pop(other_key))
+    for ended_burst in ended:
+        log_interaction(ended_burst["interaction_type"],
+                        details={**ended_burst["details"], "count": ended_burst["count"]})
+
 def log_tab_change(tab_name: str):
     """Log when user changes tabs"""
-    log_interaction("tab_change", details={"tab_name": tab_name})
+    _log_coalesced("tab_change", "tab_change", tab_name, {"tab_name": tab_name})
 
 def log_filter_usage(filter_type: str, filter_value: str):
     """Log when user uses filters"""
-    log_interaction("filter_usage", details={
+    _log_coalesced("filter_usage", ("filter_usage", filter_type), filter_value, {
         "filter_type": filter_type,
         "filter_value": filter_value
     })
 
 def log_pagination(page_number: int, results_per_page: int, result_type: str):
     """Log pagination usage"""
-    log_interaction("pagination", details={
+    _log_coalesced("pagination", ("pagination", result_type), (page_number, results_per_page), {
         "page_number": page_number,
         "results_per_page": results_per_page,
         "result_type": result_type
@@ -2,71 +2,303 @@
 Comprehensive logging system for Council Assistant
 Tracks user interactions, search queries, errors, and performance metrics
 """
+import atexit
 import logging
+from logging.handlers import MemoryHandler, RotatingFileHandler
 import json
+import os
 import datetime
+import functools
+import queue
+import threading
+import time
+from collections import Counter
 from pathlib import Path
 import streamlit as st
-from typing import Dict, Any, Optional
-import pandas as pd
+from typing import Dict, Any
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; fall back to the stdlib serializer
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; appends are written unlocked
+    fcntl = None
+
+# COUNCIL_LOG=0 turns the convenience log_* functions into no-ops
+_ENABLED = os.getenv("COUNCIL_LOG", "1") == "1"
+
+# Logs live in the repository root regardless of the working directory
+_DEFAULT_LOG_DIR = Path(__file__).resolve().parents[2] / "logs"
+
+# Log lines are queued for a single writer thread and buffered per file;
+# buffers are written out once they fill, when this many seconds have
+# passed since the last flush, or at exit
+LOG_BUFFER_SIZE = 64 * 1024
+LOG_FLUSH_INTERVAL = 5.0
+LOG_QUEUE_SIZE = 10_000  # Events beyond this backlog are dropped and counted
+LOG_DRAIN_BATCH = 256
+
+# application.log records are batched in memory and the file is rotated
+APP_LOG_CAPACITY = 256
+APP_LOG_MAX_BYTES = 10 * 1024 * 1024
+APP_LOG_BACKUPS = 5
+
+# All events go to logs/events.jsonl, told apart by their event_type. Each
+# type used to have its own file; those are still read for older history
+_LEGACY_LOGS = {
+    "search_query": "search_queries.jsonl",
+    "error": "errors.jsonl",
+    "performance": "performance.jsonl",
+    "user_interaction": "user_interactions.jsonl",
+    "user_feedback": "user_feedback.jsonl"
+}
+
+LOG_TAIL_CHUNK = 64 * 1024
+# Events are timestamped before they are queued, so neighbouring lines can be
+# slightly out of order; keep scanning this far past the analytics cutoff
+LOG_TAIL_SLACK = datetime.timedelta(minutes=5)
+
+def _dumps_line(data: Dict[str, Any]) -> bytes:
+    """Serialize a log entry as one UTF-8 JSON line"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+
+def _loads_line(line):
+    """Parse one JSON log line (orjson's decode error subclasses json's)"""
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+def _write_all(fd: int, data: bytes):
+    """Write data to a descriptor, continuing after short writes"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def _append_lines(fd: int, lines: list):
+    """
+    Append lines to an O_APPEND descriptor in one locked write
+    
+    The exclusive flock keeps other processes appending to the same file
+    from interleaving with these lines, and short writes are continued so
+    no line is truncated.
+    
+    Args:
+        fd: Descriptor opened with O_APPEND
+        lines: Encoded lines, each ending in a newline
+    """
+    data = b''.join(lines)
+    if fcntl is None:
+        _write_all(fd, data)
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        _write_all(fd, data)
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: Path):
+    """Create a log directory, at most once per path for the process"""
+    path.mkdir(parents=True, exist_ok=True)
+
+def _entry_ts(entry: Dict[str, Any]) -> float:
+    """Epoch seconds of a log entry; older entries carry an ISO `timestamp` instead of `ts`"""
+    if "ts" in entry:
+        return entry["ts"]
+    return datetime.datetime.fromisoformat(entry["timestamp"]).timestamp()
+
+def _tail_jsonl_since(filepath: Path, cutoff: datetime.datetime, event_type: str = None) -> list:
+    """
+    Read the entries of an append-only JSONL log newer than a cutoff
+    
+    Blocks are read backwards from the end of the file and the scan stops at
+    the first entry older than the cutoff (less LOG_TAIL_SLACK), so the cost
+    depends on the size of the window rather than the whole history.
+    
+    Args:
+        filepath: Path to the JSONL log
+        cutoff: Only entries with a later timestamp are returned
+        event_type: Only return entries of this event type (default: all)
+        
+    Returns:
+        List of parsed entries in chronological order
+    """
+    stop_before = (cutoff - LOG_TAIL_SLACK).timestamp()
+    cutoff = cutoff.timestamp()
+    entries = []
+    
+    with open(filepath, 'rb') as f:
+        position = os.fstat(f.fileno()).st_size
+        partial = b''
+        
+        while position > 0:
+            read_size = min(LOG_TAIL_CHUNK, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + partial).split(b'\n')
+            
+            # The first line may continue in the previous block
+            partial = lines.pop(0) if position > 0 else b''
+            
+            for line in reversed(lines):
+                if not line.strip():
+                    continue
+                try:
+                    entry = _loads_line(line)
+                    timestamp = _entry_ts(entry)
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                    continue
+                
+                if timestamp < stop_before:
+                    entries.reverse()
+                    return entries
+                if timestamp > cutoff and (event_type is None or entry.get("event_type") == event_type):
+                    entries.append(entry)
+    
+    entries.reverse()
+    return entries
+
 
 class CouncilLogger:
     """
     Centralized logging system for the Council Assistant application
     """
     
-    def __init__(self, log_dir: Path = None):
-        if log_dir is None:
-            log_dir = Path("./logs")
-        
+    def __init__(self, log_dir: Path = _DEFAULT_LOG_DIR):
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
+        _ensure_dir(self.log_dir)
         
         # Set up different log files
-        self.search_log = self.log_dir / "search_queries.jsonl"
-        self.error_log = self.log_dir / "errors.jsonl"
-        self.performance_log = self.log_dir / "performance.jsonl"
-        self.user_log = self.log_dir / "user_interactions.jsonl"
-        self.feedback_log = self.log_dir / "user_feedback.jsonl"
+        self.events_log = self.log_dir / "events.jsonl"
+        
+        # O_APPEND descriptors and pending lines per file, only written by
+        # the writer thread (flush() from other threads takes the lock)
+        self._fds = {}
+        self._buffers = {}
+        self._buffered_bytes = 0
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.dropped_events = 0
+        threading.Thread(target=self._drain, name="council-log-writer", daemon=True).start()
+        atexit.register(self.flush)
         
         # Set up Python logging
         self._setup_python_logging()
     
     def _setup_python_logging(self):
         """Set up standard Python logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_dir / "application.log"),
-                logging.StreamHandler()
-            ]
-        )
         self.logger = logging.getLogger("CouncilAssistant")
+        self.logger.setLevel(logging.INFO)
+        if self.logger.handlers:
+            return  # Another CouncilLogger already attached the handlers
+        
+        # Records are held in memory and written in batches, or straight away
+        # once an error is logged
+        file_handler = RotatingFileHandler(
+            self.log_dir / "application.log",
+            maxBytes=APP_LOG_MAX_BYTES, backupCount=APP_LOG_BACKUPS
+        )
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        file_handler.setFormatter(formatter)
+        memory_handler = MemoryHandler(APP_LOG_CAPACITY, flushLevel=logging.ERROR, target=file_handler)
+        self.logger.addHandler(memory_handler)
+        atexit.register(memory_handler.flush)
+        
+        # Warnings and errors also go straight to the console, unbuffered
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.WARNING)
+        console_handler.setFormatter(formatter)
+        self.logger.addHandler(console_handler)
     
-    def _write_jsonl(self, filepath: Path, data: Dict[str, Any]):
-        """Write a single JSON line to a log file"""
+    def _get_fd(self, filepath: Path) -> int:
+        """Return the O_APPEND descriptor for a log file, opening it on first use"""
+        fd = self._fds.get(filepath)
+        if fd is None:
+            fd = os.open(filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._fds[filepath] = fd
+        return fd
+    
+    def _write_jsonl(self, filepath: Path, data: Dict[str, Any], flush: bool = False):
+        """Queue a single JSON line for a log file"""
         try:
-            # Ensure the directory exists
-            filepath.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Create the file if it doesn't exist
-            if not filepath.exists():
-                filepath.touch()
-            
-            with open(filepath, 'a', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, default=str)
-                f.write('\n')
+            # Serialize here so the queued line is a snapshot of the caller's data
+            line = _dumps_line(data)
+            self._queue.put_nowait((filepath, line, flush))
+        except queue.Full:
+            self.dropped_events += 1
         except Exception as e:
             self.logger.error(f"Failed to write to {filepath}: {str(e)}")
     
+    def _drain(self):
+        """Writer thread: batch queued lines and append them per file"""
+        while True:
+            try:
+                batch = [self._queue.get(timeout=LOG_FLUSH_INTERVAL)]
+            except queue.Empty:
+                self.flush_buffers()  # Idle: write out whatever is buffered
+                continue
+            while len(batch) < LOG_DRAIN_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _write_batch(self, batch):
+        """Buffer a batch of (filepath, line, flush) entries, writing out when due"""
+        flush = False
+        with self._lock:
+            for filepath, line, flush_now in batch:
+                self._buffers.setdefault(filepath, []).append(line)
+                self._buffered_bytes += len(line)
+                flush = flush or flush_now
+            if (flush or self._buffered_bytes >= LOG_BUFFER_SIZE
+                    or time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL):
+                self._flush_files()
+    
+    def _flush_files(self):
+        """Append every file's pending lines (caller holds the lock)"""
+        for filepath, lines in self._buffers.items():
+            if not lines:
+                continue
+            try:
+                _append_lines(self._get_fd(filepath), lines)
+            except Exception as e:
+                self.logger.error(f"Failed to write to {filepath}: {str(e)}")
+            lines.clear()
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+    
+    def flush_buffers(self):
+        """Write the file buffers to disk without waiting for queued events"""
+        with self._lock:
+            self._flush_files()
+    
+    def flush(self):
+        """Wait for queued events to be written, then write all buffers to disk"""
+        self._queue.join()
+        self.flush_buffers()
+    
     def _get_session_info(self) -> Dict[str, Any]:
-        """Get basic session information"""
-        return {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "session_id": st.session_state.get("session_id", "unknown"),
-            "user_agent": st.context.headers.get("User-Agent", "unknown") if hasattr(st.context, 'headers') else "unknown"
-        }
+        """Get basic session information (ids and headers are looked up once per session)"""
+        session = st.session_state.get("_log_session_info")
+        if session is None:
+            session = {
+                "session_id": st.session_state.get("session_id", "unknown"),
+                "user_agent": st.context.headers.get("User-Agent", "unknown") if hasattr(st.context, 'headers') else "unknown"
+            }
+            st.session_state["_log_session_info"] = session
+        return {"ts": time.time(), **session}
     
     def log_search_query(self, query: str, tab_name: str, results_count: int, 
                         search_time: float = None, filters: Dict = None):
@@ -82,7 +314,7 @@ class CouncilLogger:
             "query_length": len(query),
             "query_word_count": len(query.split())
         }
-        self._write_jsonl(self.search_log, log_entry)
+        self._write_jsonl(self.events_log, log_entry)
         self.logger.info(f"Search: '{query}' in {tab_name} -> {results_count} results")
     
     def log_error(self, error_type: str, error_message: str, context: Dict = None):
@@ -94,7 +326,7 @@ class CouncilLogger:
             "error_message": error_message,
             "context": context or {}
         }
-        self._write_jsonl(self.error_log, log_entry)
+        self._write_jsonl(self.events_log, log_entry, flush=True)
         self.logger.error(f"{error_type}: {error_message}")
     
     def log_performance(self, operation: str, duration: float, details: Dict = None):
@@ -106,7 +338,7 @@ class CouncilLogger:
             "duration_seconds": duration,
             "details": details or {}
         }
-        self._write_jsonl(self.performance_log, log_entry)
+        self._write_jsonl(self.events_log, log_entry)
         self.logger.info(f"Performance: {operation} took {duration:.2f}s")
     
     def log_user_interaction(self, interaction_type: str, details: Dict = None):
@@ -117,7 +349,7 @@ class CouncilLogger:
             "interaction_type": interaction_type,
             "details": details or {}
         }
-        self._write_jsonl(self.user_log, log_entry)
+        self._write_jsonl(self.events_log, log_entry)
     
     def log_feedback(self, feedback_type: str, message: str, rating: int = None, 
                     contact_info: str = None, query_context: str = None):
@@ -131,42 +363,52 @@ class CouncilLogger:
             "contact_info": contact_info,
             "query_context": query_context
         }
-        self._write_jsonl(self.feedback_log, log_entry)
+        self._write_jsonl(self.events_log, log_entry, flush=True)
         self.logger.info(f"Feedback received: {feedback_type}")
     
+    def _read_events_since(self, event_type: str, cutoff: datetime.datetime) -> list:
+        """
+        Read the events of one type newer than a cutoff
+        
+        Args:
+            event_type: Event type to keep, e.g. "search_query" or "error"
+            cutoff: Only events with a later timestamp are returned
+            
+        Returns:
+            List of entries in chronological order, including any from the
+            type's legacy log file
+        """
+        entries = []
+        legacy_log = self.log_dir / _LEGACY_LOGS[event_type]
+        if legacy_log.exists():
+            entries.extend(_tail_jsonl_since(legacy_log, cutoff))
+        if self.events_log.exists():
+            entries.extend(_tail_jsonl_since(self.events_log, cutoff, event_type))
+        return entries
+    
     def get_search_analytics(self, days: int = 7) -> Dict[str, Any]:
         """Get search analytics for the last N days"""
         try:
-            if not self.search_log.exists():
-                return {"error": "No search log found"}
-            
-            # Read search logs
-            searches = []
-            with open(self.search_log, 'r') as f:
-                for line in f:
-                    try:
-                        searches.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
+            self.flush()
+            cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days)
+            searches = self._read_events_since("search_query", cutoff_date)
             
             if not searches:
                 return {"total_searches": 0}
             
-            df = pd.DataFrame(searches)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Filter to last N days
-            cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days)
-            recent_df = df[df['timestamp'] > cutoff_date]
+            results_counts = [search["results_count"] for search in searches
+                              if search.get("results_count") is not None]
+            zero_result_searches = results_counts.count(0)
+            queries = Counter(search.get("query") for search in searches)
             
             analytics = {
-                "total_searches": len(recent_df),
-                "unique_queries": recent_df['query'].nunique(),
-                "most_popular_queries": recent_df['query'].value_counts().head(10).to_dict(),
-                "tab_usage": recent_df['tab_name'].value_counts().to_dict(),
-                "average_results_per_search": recent_df['results_count'].mean(),
-                "zero_result_searches": len(recent_df[recent_df['results_count'] == 0]),
-                "search_success_rate": 1 - (len(recent_df[recent_df['results_count'] == 0]) / len(recent_df))
+                "total_searches": len(searches),
+                "unique_queries": len(queries),
+                "most_popular_queries": dict(queries.most_common(10)),
+                "tab_usage": dict(Counter(search.get("tab_name") for search in searches).most_common()),
+                "average_results_per_search": sum(results_counts) / len(results_counts) if results_counts else None,
+                "zero_result_searches": zero_result_searches,
+                "search_success_rate": 1 - (zero_result_searches / len(searches))
             }
             
             return analytics
@@ -178,55 +420,73 @@ class CouncilLogger:
     def get_error_summary(self, days: int = 7) -> Dict[str, Any]:
         """Get error summary for the last N days"""
         try:
-            if not self.error_log.exists():
-                return {"total_errors": 0}
-            
-            errors = []
-            with open(self.error_log, 'r') as f:
-                for line in f:
-                    try:
-                        errors.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
+            self.flush()
+            cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days)
+            errors = self._read_events_since("error", cutoff_date)
             
             if not errors:
                 return {"total_errors": 0}
             
-            df = pd.DataFrame(errors)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days)
-            recent_df = df[df['timestamp'] > cutoff_date]
-            
             return {
-                "total_errors": len(recent_df),
-                "error_types": recent_df['error_type'].value_counts().to_dict(),
-                "recent_errors": recent_df.tail(5)[['timestamp', 'error_type', 'error_message']].to_dict('records')
+                "total_errors": len(errors),
+                "error_types": dict(Counter(error.get("error_type") for error in errors).most_common()),
+                "recent_errors": [
+                    {
+                        "timestamp": datetime.datetime.fromtimestamp(_entry_ts(error)),
+                        "error_type": error.get("error_type"),
+                        "error_message": error.get("error_message")
+                    }
+                    for error in errors[-5:]
+                ]
             }
             
         except Exception as e:
             return {"error": str(e)}
 
-# Global logger instance
-logger = CouncilLogger()
+@functools.lru_cache(maxsize=None)
+def get_logger() -> CouncilLogger:
+    """Return the shared logger, creating it (and its writer thread) on first use"""
+    return CouncilLogger()
+
+def __getattr__(name):
+    # Keep `from logging_system import logger` working without creating the
+    # logger at import time
+    if name == "logger":
+        return get_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def set_enabled(enabled: bool):
+    """Switch the convenience log_* functions on or off at runtime"""
+    global _ENABLED
+    _ENABLED = bool(enabled)
 
 # Convenience functions for easy import
 def log_search(query: str, tab_name: str, results_count: int, **kwargs):
     """Convenience function for logging searches"""
-    logger.log_search_query(query, tab_name, results_count, **kwargs)
+    if not _ENABLED:
+        return
+    get_logger().log_search_query(query, tab_name, results_count, **kwargs)
 
 def log_error(error_type: str, error_message: str, **kwargs):
     """Convenience function for logging errors"""
-    logger.log_error(error_type, error_message, **kwargs)
+    if not _ENABLED:
+        return
+    get_logger().log_error(error_type, error_message, **kwargs)
 
 def log_performance(operation: str, duration: float, **kwargs):
     """Convenience function for logging performance"""
-    logger.log_performance(operation, duration, **kwargs)
+    if not _ENABLED:
+        return
+    get_logger().log_performance(operation, duration, **kwargs)
 
 def log_interaction(interaction_type: str, **kwargs):
     """Convenience function for logging user interactions"""
-    logger.log_user_interaction(interaction_type, **kwargs)
+    if not _ENABLED:
+        return
+    get_logger().log_user_interaction(interaction_type, **kwargs)
 
 def log_feedback(feedback_type: str, message: str, **kwargs):
     """Convenience function for logging feedback"""
-    logger.log_feedback(feedback_type, message, **kwargs)
\ No newline at end of file
+    if not _ENABLED:
+        return
+    get_logger().log_feedback(feedback_type, message, **kwargs)
\ No newline at end of file
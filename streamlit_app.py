@@ -3,14 +3,13 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
 
 # Import our custom modules
 from modules.search.semantic_search import search_agendas, search_pdfs, sort_results, load_search_index
-from modules.search.result_formatters import format_agenda_results_enhanced, format_pdf_results_enhanced, display_results_with_pagination
+from modules.search.result_formatters import format_agenda_results_enhanced, format_pdf_results_enhanced, display_results_with_pagination, apply_results_css
 from modules.search.ai_analysis import generate_ai_analysis, get_analysis_source_info
-from modules.data.loaders import load_base_data, load_search_metadata, validate_data_integrity
+from modules.data.loaders import load_base_data, load_joined_search_metadata, load_lookup_tables, validate_data_integrity
 from modules.utils.logging_system import log_search, log_error, log_performance
 
 # --------------------------
@@ -101,6 +100,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Results table styling, shared by both result tabs
+apply_results_css()
+
 # --------------------------
 # 3. SESSION STATE & SIDEBAR
 # --------------------------
@@ -124,7 +126,8 @@ st.markdown("""
 # Load data
 with st.spinner("Loading council data..."):
     data = load_base_data(PATHS)
-    search_metadata = load_search_metadata(PATHS)
+    search_metadata = load_joined_search_metadata(PATHS)  # Meetings/documents joined once at load
+    lookups = load_lookup_tables(PATHS)
 
 # Validate data
 if not validate_data_integrity(data):
@@ -213,6 +216,9 @@ with st.sidebar:
 # 7. SEARCH TABS
 # --------------------------
 if st.session_state.get("query"):
+    # Imported here so the welcome page doesn't wait for the OpenAI SDK
+    from openai import OpenAI
+    
     tabs = st.tabs(["Meeting Discussions", "Documents & Reports", "AI Summary"])
     
     # TAB 0: AGENDA ITEMS
@@ -234,17 +240,6 @@ if st.session_state.get("query"):
                     )
                     
                     if not agenda_results.empty:
-                        # IMPORTANT: Merge with meetings data to get web_meeting_code
-                        if not data["meetings"].empty:
-                            # Make sure we include web_meeting_code in the merge
-                            meeting_cols = [col for col in ["meeting_id", "committee_name", "web_meeting_code"] 
-                                          if col in data["meetings"].columns]
-                            agenda_results = agenda_results.merge(
-                                data["meetings"][meeting_cols],
-                                on="meeting_id",
-                                how="left"
-                            )
-                        
                         st.session_state.agenda_results = agenda_results
                        
                         # NOW show filters with populated data
@@ -278,21 +273,27 @@ if st.session_state.get("query"):
                                 key="agenda_results_per_page"
                             )
                         
-                        # Apply committee filter
-                        filtered_agendas = agenda_results.copy()
+                        # Apply committee filter (masks and sorting return new frames,
+                        # so the results kept in session state are never modified)
+                        filtered_agendas = agenda_results
                         if selected_committee != "All committees" and 'committee_name' in filtered_agendas.columns:
                             filtered_agendas = filtered_agendas[filtered_agendas['committee_name'] == selected_committee]
 
                         # Sort and display results
                         filtered_agendas = sort_results(filtered_agendas, st.session_state.filters['sort_method'])
                         
-                        # Don't pass the original meetings DataFrame since we already merged
-                        formatted_agendas = format_agenda_results_enhanced(
-                            filtered_agendas, 
-                            pd.DataFrame(),  # Empty DataFrame instead of data["meetings"]
-                            data["agendas"]
+                        # Only format the rows on the current page; don't pass the
+                        # original meetings DataFrame since we already merged
+                        display_results_with_pagination(
+                            filtered_agendas,
+                            results_per_page=results_per_page_agenda,
+                            key_prefix="agenda",
+                            formatter_fn=lambda page: format_agenda_results_enhanced(
+                                page,
+                                pd.DataFrame(),  # Empty DataFrame instead of data["meetings"]
+                                lookups["agendas_by_id"]
+                            )
                         )
-                        display_results_with_pagination(formatted_agendas, results_per_page=results_per_page_agenda, key_prefix="agenda")
                         
                     else:
                         st.info("No matching agenda items found. Try different search terms or check other tabs.")
@@ -321,29 +322,6 @@ if st.session_state.get("query"):
                     )
                     
                     if not pdf_results.empty:
-                        # Merge with documents data - this is where the URLs are!
-                        if not data["documents"].empty:
-                            # Get all needed columns including URL
-                            doc_cols = [col for col in ['doc_id', 'url', 'display_title', 'source_filename', 
-                                      'meeting_date', 'summary', 'committee_id', 'doc_category', 'meeting_id'] 
-                                      if col in data["documents"].columns]
-                            
-                            pdf_results = pdf_results.merge(
-                                data["documents"][doc_cols],
-                                on='doc_id',
-                                how='left'
-                            )
-                        
-                        # Merge with meetings for committee names and meeting codes
-                        if not data["meetings"].empty and 'meeting_id' in pdf_results.columns:
-                            meeting_cols = [col for col in ['meeting_id', 'committee_name', 'web_meeting_code'] 
-                                          if col in data["meetings"].columns]
-                            pdf_results = pdf_results.merge(
-                                data["meetings"][meeting_cols],
-                                on='meeting_id',
-                                how='left'
-                            )
-                        
                         st.session_state.pdf_results = pdf_results
                         
                         # NOW show filters with populated data - all on same line
@@ -386,8 +364,8 @@ if st.session_state.get("query"):
                                 key="pdf_results_per_page"
                             )
                         
-                        # Apply filters
-                        filtered_pdfs = pdf_results.copy()
+                        # Apply filters (no copy needed; see the agenda tab)
+                        filtered_pdfs = pdf_results
                         
                         if selected_committee != "All committees" and 'committee_name' in filtered_pdfs.columns:
                             filtered_pdfs = filtered_pdfs[filtered_pdfs['committee_name'] == selected_committee]
@@ -404,8 +382,14 @@ if st.session_state.get("query"):
 
                         # Sort results
                         filtered_pdfs = sort_results(filtered_pdfs, st.session_state.filters['sort_method'])
-                        formatted_pdfs = format_pdf_results_enhanced(filtered_pdfs, data["documents"], data["meetings"])
-                        display_results_with_pagination(formatted_pdfs, results_per_page=results_per_page, key_prefix="pdf")
+                        
+                        # Only format the rows on the current page
+                        display_results_with_pagination(
+                            filtered_pdfs,
+                            results_per_page=results_per_page,
+                            key_prefix="pdf",
+                            formatter_fn=lambda page: format_pdf_results_enhanced(page, data["documents"], data["meetings"])
+                        )
                         
                     else:
                         st.info("No matching documents found. Try different search terms or check other tabs.")
@@ -448,9 +432,9 @@ if st.session_state.get("query"):
                                 query=st.session_state.query,
                                 agenda_results=agenda_results,
                                 pdf_results=pdf_results,
-                                agendas_df=data["agendas"],
-                                meetings_df=data["meetings"],
-                                documents_df=data["documents"],
+                                agendas_df=lookups["agendas_by_id"],
+                                meetings_df=lookups["meetings_by_id"],
+                                documents_df=lookups["documents_by_id"],
                                 client=client,
                                 model=GPT_MODEL
                             )
@@ -483,11 +467,15 @@ else:
     date_range_text = ""
     if not data["meetings"].empty and "meeting_date" in data["meetings"].columns:
         try:
-            # Convert meeting dates (assuming they're in milliseconds)
-            dates = pd.to_datetime(data["meetings"]["meeting_date"], unit="ms", errors="coerce").dropna()
-            if not dates.empty:
-                start_year = dates.min().year
-                end_year = min(dates.max().year, 2025)  # Cap at current year
+            # Meeting dates are epoch milliseconds; only the two extremes need converting
+            millis = pd.to_numeric(data["meetings"]["meeting_date"], errors="coerce")
+            # Values pandas can't represent as dates are dropped, as a full conversion would
+            millis = millis[millis.between(pd.Timestamp.min.value // 10**6, pd.Timestamp.max.value // 10**6)]
+            start_date = pd.to_datetime(millis.min(), unit="ms", errors="coerce")
+            end_date = pd.to_datetime(millis.max(), unit="ms", errors="coerce")
+            if pd.notna(start_date) and pd.notna(end_date):
+                start_year = start_date.year
+                end_year = min(end_date.year, 2025)  # Cap at current year
                 if start_year == end_year:
                     date_range_text = f"from {start_year}"
                 else: